@@ -0,0 +1,148 @@
+import itertools
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# Priority classes; lower runs first
+CRITICAL = 0
+NORMAL = 1
+ANALYTICS = 2
+
+
+class Rejected(Exception):
+    """Request refused by admission control: 429 for a client over its share, 503 when saturated."""
+
+    def __init__(self, status: int, message: str, retry_after: int):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class Waiter:
+    def __init__(self, priority: int, client: str, seq: int):
+        self.priority = priority
+        self.client = client
+        self.seq = seq
+        self.granted = False
+        self.error: Rejected | None = None
+        self.event = threading.Event()
+
+
+class AdmissionController:
+    """Bounds how many tool calls run at once and how many may wait for a slot.
+
+    Freed slots go to the highest-priority waiter, and among equal priorities to the client with the
+    fewest calls running. When the queue is full, a new call displaces the newest waiter of a lower
+    priority class, or is rejected. Each client may hold at most max_per_client running or queued calls.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, max_per_client: int, queue_timeout: float):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_per_client = max_per_client
+        self.queue_timeout = queue_timeout
+        self._active = 0
+        self._waiting: list[Waiter] = []
+        # client -> calls running, and running plus queued
+        self._running: dict[str, int] = {}
+        self._held: dict[str, int] = {}
+        # Moving average of call duration in seconds, used for Retry-After
+        self._service_time = 1.0
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def admit(self, priority: int, client: str, timeout: float = None):
+        """Run the body once a slot is free; raises Rejected if none frees up within timeout."""
+        self.acquire(priority, client, timeout)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(client, time.monotonic() - started)
+
+    def acquire(self, priority: int, client: str, timeout: float = None) -> None:
+        timeout = self.queue_timeout if timeout is None else timeout
+        with self._lock:
+            if not timeout > 0:
+                raise Rejected(503, "Request deadline has already passed", self._retry_after())
+            if self._held.get(client, 0) >= self.max_per_client:
+                raise Rejected(429, f"Client {client} already has {self.max_per_client} requests in progress",
+                               self._retry_after())
+            if self._active < self.max_concurrent and not self._waiting:
+                self._active += 1
+                self._hold(client)
+                self._running[client] = self._running.get(client, 0) + 1
+                return
+            if len(self._waiting) >= self.max_queue:
+                victim = max(self._waiting, key=lambda w: (w.priority, w.seq), default=None)
+                if victim is None or victim.priority <= priority:
+                    raise Rejected(503, "Server is at capacity", self._retry_after())
+                # Shed the newest waiter of the lowest class to make room for more important work
+                self._waiting.remove(victim)
+                self._unhold(victim.client)
+                victim.error = Rejected(503, "Request was shed for higher-priority work", self._retry_after())
+                victim.event.set()
+            waiter = Waiter(priority, client, next(self._seq))
+            self._waiting.append(waiter)
+            self._hold(client)
+
+        try:
+            waiter.event.wait(min(timeout, threading.TIMEOUT_MAX))
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        with self._lock:
+            if waiter.granted:
+                return
+            if waiter.error is None:
+                self._waiting.remove(waiter)
+                self._unhold(client)
+                waiter.error = Rejected(503, "Timed out waiting for capacity", self._retry_after())
+        raise waiter.error
+
+    def release(self, client: str, elapsed: float = None) -> None:
+        with self._lock:
+            if elapsed is not None:
+                self._service_time = 0.8 * self._service_time + 0.2 * elapsed
+            self._unhold(client)
+            self._running[client] -= 1
+            if not self._running[client]:
+                del self._running[client]
+            if not self._waiting:
+                self._active -= 1
+                return
+            # Hand the slot straight to the next waiter, so _active stays the same
+            waiter = min(self._waiting, key=lambda w: (w.priority, self._running.get(w.client, 0), w.seq))
+            self._waiting.remove(waiter)
+            self._running[waiter.client] = self._running.get(waiter.client, 0) + 1
+            waiter.granted = True
+            waiter.event.set()
+
+    def _abandon(self, waiter: Waiter) -> None:
+        """Undo a wait that ended in an exception: leave the queue, or pass on a slot already granted."""
+        with self._lock:
+            if not waiter.granted:
+                if waiter.error is None:
+                    self._waiting.remove(waiter)
+                    self._unhold(waiter.client)
+                    waiter.error = Rejected(503, "Request was abandoned", self._retry_after())
+                return
+        self.release(waiter.client)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"running": self._active, "queued": len(self._waiting), "clients": len(self._held)}
+
+    def _hold(self, client: str) -> None:
+        self._held[client] = self._held.get(client, 0) + 1
+
+    def _unhold(self, client: str) -> None:
+        self._held[client] -= 1
+        if not self._held[client]:
+            del self._held[client]
+
+    def _retry_after(self) -> int:
+        # Roughly how long until the current queue drains, in whole seconds
+        return max(1, math.ceil(self._service_time * (len(self._waiting) + 1) / self.max_concurrent))
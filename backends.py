@@ -0,0 +1,349 @@
+import json
+import select
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any
+from urllib.parse import urlsplit
+
+# Cached responses kept per page when caching in memory
+MEMORY_CACHE_SIZE = 512
+# The in-memory and SQLite backends drop expired entries after this many writes
+PRUNE_EVERY = 1000
+
+
+class StateBackend(ABC):
+    """Key-value store for cached responses, rate-limit budgets and job state.
+
+    Values must be JSON-serializable. ttl is in seconds; None keeps the value until evicted.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Any:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float = None) -> None:
+        ...
+
+    @abstractmethod
+    def add(self, key: str, value: Any, ttl: float = None) -> bool:
+        """Set key only if it does not exist yet. Returns whether it was set."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def incr(self, key: str, amount: int = 1, ttl: float = None) -> int:
+        """Atomically add to an integer counter; ttl applies when the counter is created."""
+
+    @property
+    def shared(self) -> bool:
+        """Whether other processes see the same state."""
+        return True
+
+    def namespace(self, prefix: str) -> "StateBackend":
+        return NamespacedBackend(self, prefix)
+
+
+class NamespacedBackend(StateBackend):
+    """View of a backend whose keys are prefixed, so pages never see each other's state."""
+
+    def __init__(self, backend: StateBackend, prefix: str):
+        self.backend = backend
+        self.prefix = prefix
+
+    def get(self, key: str) -> Any:
+        return self.backend.get(f"{self.prefix}:{key}")
+
+    def set(self, key: str, value: Any, ttl: float = None) -> None:
+        self.backend.set(f"{self.prefix}:{key}", value, ttl)
+
+    def add(self, key: str, value: Any, ttl: float = None) -> bool:
+        return self.backend.add(f"{self.prefix}:{key}", value, ttl)
+
+    def delete(self, key: str) -> None:
+        self.backend.delete(f"{self.prefix}:{key}")
+
+    def incr(self, key: str, amount: int = 1, ttl: float = None) -> int:
+        return self.backend.incr(f"{self.prefix}:{key}", amount, ttl)
+
+    @property
+    def shared(self) -> bool:
+        return self.backend.shared
+
+
+class MemoryBackend(StateBackend):
+    """Per-process store. With max_entries it is a cache that evicts the least recently used entry
+    once full; without, entries only leave when they expire, as job and dedup state needs.
+    """
+
+    def __init__(self, max_entries: int = None):
+        self.max_entries = max_entries
+        # key -> (value, expires_at or None)
+        self._entries: OrderedDict[str, tuple[Any, float | None]] = OrderedDict()
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def shared(self) -> bool:
+        return False
+
+    def _live(self, key: str) -> tuple[Any, float | None] | None:
+        entry = self._entries.get(key)
+        if entry and entry[1] is not None and entry[1] <= time.time():
+            del self._entries[key]
+            return None
+        return entry
+
+    def _store(self, key: str, value: Any, ttl: float | None) -> None:
+        now = time.time()
+        self._entries[key] = (value, now + ttl if ttl else None)
+        self._entries.move_to_end(key)
+        while self.max_entries and len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._writes += 1
+        if self._writes % PRUNE_EVERY == 0:
+            expired = [k for k, (_, expires_at) in self._entries.items() if expires_at is not None and expires_at <= now]
+            for k in expired:
+                del self._entries[k]
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._live(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, value: Any, ttl: float = None) -> None:
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def add(self, key: str, value: Any, ttl: float = None) -> bool:
+        with self._lock:
+            if self._live(key) is not None:
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def incr(self, key: str, amount: int = 1, ttl: float = None) -> int:
+        with self._lock:
+            entry = self._live(key)
+            if entry is None:
+                self._store(key, amount, ttl)
+                return amount
+            value = entry[0] + amount
+            self._entries[key] = (value, entry[1])
+            return value
+
+
+class SQLiteBackend(StateBackend):
+    """Store in a SQLite file, shared by every worker process on the host."""
+
+    def __init__(self, path: str, timeout: float = 5.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._writes = 0
+        db = self._db()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)")
+
+    def _db(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            # Autocommit mode; multi-statement updates use explicit IMMEDIATE transactions
+            db = self._local.db = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def _written(self, db: sqlite3.Connection) -> None:
+        self._writes += 1
+        if self._writes % PRUNE_EVERY == 0:
+            db.execute("DELETE FROM state WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+
+    def get(self, key: str) -> Any:
+        row = self._db().execute(
+            "SELECT value FROM state WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)", (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any, ttl: float = None) -> None:
+        db = self._db()
+        db.execute("INSERT OR REPLACE INTO state (key, value, expires_at) VALUES (?, ?, ?)",
+                   (key, json.dumps(value), time.time() + ttl if ttl else None))
+        self._written(db)
+
+    def add(self, key: str, value: Any, ttl: float = None) -> bool:
+        db = self._db()
+        now = time.time()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute("DELETE FROM state WHERE key = ? AND expires_at IS NOT NULL AND expires_at <= ?", (key, now))
+            added = db.execute("INSERT OR IGNORE INTO state (key, value, expires_at) VALUES (?, ?, ?)",
+                               (key, json.dumps(value), now + ttl if ttl else None)).rowcount == 1
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        self._written(db)
+        return added
+
+    def delete(self, key: str) -> None:
+        self._db().execute("DELETE FROM state WHERE key = ?", (key,))
+
+    def incr(self, key: str, amount: int = 1, ttl: float = None) -> int:
+        db = self._db()
+        now = time.time()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute("SELECT value, expires_at FROM state WHERE key = ?", (key,)).fetchone()
+            if row and (row[1] is None or row[1] > now):
+                value, expires_at = json.loads(row[0]) + amount, row[1]
+            else:
+                value, expires_at = amount, now + ttl if ttl else None
+            db.execute("INSERT OR REPLACE INTO state (key, value, expires_at) VALUES (?, ?, ?)",
+                       (key, json.dumps(value), expires_at))
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        self._written(db)
+        return value
+
+
+class RedisError(Exception):
+    pass
+
+
+class RedisBackend(StateBackend):
+    """Store in any server that speaks the Redis protocol (RESP), shared across hosts.
+
+    Uses one connection per thread and only GET, SET, DEL, INCRBY and PEXPIRE.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 6379, db: int = 0, password: str = None,
+                 timeout: float = 5.0):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self) -> tuple[socket.socket, Any]:
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        reader = sock.makefile("rb")
+        self._local.conn = (sock, reader)
+        if self.password:
+            self._roundtrip(sock, reader, "AUTH", self.password)
+        if self.db:
+            self._roundtrip(sock, reader, "SELECT", self.db)
+        return sock, reader
+
+    def _disconnect(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn:
+            conn[0].close()
+
+    def _command(self, *args: Any) -> Any:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._stale(conn[0]):
+            # The server closed this idle connection; nothing has been sent on it yet
+            self._disconnect()
+            conn = None
+        try:
+            if conn is None:
+                conn = self._connect()
+            return self._roundtrip(*conn, *args)
+        except (OSError, ConnectionError):
+            # Once a command is sent it may have run, so it is never retried: INCRBY would count
+            # twice, and a repeated SET NX would report the caller's own key as taken
+            self._disconnect()
+            raise
+
+    @staticmethod
+    def _stale(sock: socket.socket) -> bool:
+        # Between commands nothing should be readable; EOF or stray data means the connection is unusable
+        readable, _, _ = select.select([sock], [], [], 0)
+        return bool(readable)
+
+    def _roundtrip(self, sock: socket.socket, reader: Any, *args: Any) -> Any:
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        sock.sendall(b"".join(parts))
+        return self._read(reader)
+
+    def _read(self, reader: Any) -> Any:
+        line = reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            raise RedisError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(payload)
+            return None if length < 0 else [self._read(reader) for _ in range(length)]
+        raise RedisError(f"Unexpected reply: {line!r}")
+
+    def get(self, key: str) -> Any:
+        value = self._command("GET", key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, value: Any, ttl: float = None) -> None:
+        if ttl:
+            self._command("SET", key, json.dumps(value), "PX", int(ttl * 1000))
+        else:
+            self._command("SET", key, json.dumps(value))
+
+    def add(self, key: str, value: Any, ttl: float = None) -> bool:
+        args = ["SET", key, json.dumps(value), "NX"]
+        if ttl:
+            args += ["PX", int(ttl * 1000)]
+        return self._command(*args) is not None
+
+    def delete(self, key: str) -> None:
+        self._command("DEL", key)
+
+    def incr(self, key: str, amount: int = 1, ttl: float = None) -> int:
+        value = self._command("INCRBY", key, amount)
+        if ttl and value == amount:
+            self._command("PEXPIRE", key, int(ttl * 1000))
+        return value
+
+
+def backend_from_url(url: str = None) -> StateBackend:
+    """Build a backend from "memory", "sqlite:///state.db" (relative), "sqlite:////var/lib/state.db"
+    (absolute) or "redis://[:password@]host:port/db".
+    """
+    if not url or url == "memory":
+        return MemoryBackend()
+    parts = urlsplit(url)
+    if parts.scheme == "sqlite":
+        return SQLiteBackend(parts.netloc + parts.path if parts.netloc else parts.path[1:] or "state.db")
+    if parts.scheme == "redis":
+        db = int(parts.path.lstrip("/") or 0)
+        return RedisBackend(parts.hostname or "127.0.0.1", parts.port or 6379, db, parts.password)
+    raise ValueError(f"Unsupported state backend: {url}")
@@ -0,0 +1,443 @@
+"""Local stand-in for graph.facebook.com.
+
+Serves the Graph API endpoints used by FacebookAPI from seeded in-memory data, with
+configurable latency, cursor pagination, rate-limit usage headers, error injection,
+ETags, batch requests and `ids` lookups. Run it standalone:
+
+    python -m benchmarks.graph_simulator --port 8765 --latency lognormal:40:0.5 --error-rate 0.01
+
+and point the server at it with GRAPH_API_BASE_URL=http://127.0.0.1:8765/v22.0.
+"""
+import argparse
+import base64
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qsl, urlsplit
+
+DEFAULT_PAGE_ID = "1000000000000001"
+DEFAULT_PAGE_SIZE = 25
+VIDEO_CHUNK_SIZE = 4 * 1024 * 1024
+
+INSIGHT_METRICS = [
+    "post_impressions", "post_impressions_unique", "post_impressions_paid",
+    "post_impressions_organic", "post_engaged_users", "post_clicks",
+    "post_reactions_like_total", "post_reactions_love_total", "post_reactions_wow_total",
+    "post_reactions_haha_total", "post_reactions_sorry_total", "post_reactions_anger_total",
+]
+
+# Transient errors Graph returns under load, with their HTTP status
+INJECTED_ERRORS = [
+    (500, {"message": "An unknown error has occurred.", "type": "OAuthException", "code": 1, "is_transient": True}),
+    (500, {"message": "An unexpected error has occurred. Please retry your request later.",
+           "type": "OAuthException", "code": 2, "is_transient": True}),
+]
+RATE_LIMIT_ERROR = (400, {"message": "Application request limit reached", "type": "OAuthException",
+                          "code": 4, "is_transient": True})
+
+
+class Latency:
+    """Samples response delays in milliseconds from a spec such as:
+
+    fixed:20, uniform:10:50, normal:40:10, lognormal:40:0.5 (median, sigma), exponential:30 (mean)
+    """
+
+    def __init__(self, spec: str = "fixed:0", seed: int = 0):
+        kind, *args = spec.split(":")
+        self.kind = kind
+        self.args = [float(a) for a in args]
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        if kind not in ("fixed", "uniform", "normal", "lognormal", "exponential"):
+            raise ValueError(f"Unknown latency distribution: {kind}")
+
+    def sample(self) -> float:
+        with self._lock:
+            if self.kind == "fixed":
+                value = self.args[0]
+            elif self.kind == "uniform":
+                value = self._rng.uniform(*self.args)
+            elif self.kind == "normal":
+                value = self._rng.gauss(*self.args)
+            elif self.kind == "lognormal":
+                median, sigma = self.args
+                value = median * self._rng.lognormvariate(0, sigma)
+            else:
+                value = self._rng.expovariate(1 / self.args[0])
+        return max(value, 0.0)
+
+
+class GraphStore:
+    """Seeded posts, comments and insights for one simulated page."""
+
+    def __init__(self, page_id: str = DEFAULT_PAGE_ID, posts: int = 100, comments_per_post: int = 20, seed: int = 0):
+        self.page_id = page_id
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self.objects: dict[str, dict[str, Any]] = {
+            page_id: {"id": page_id, "name": "Simulated Page", "fan_count": self._rng.randint(1000, 100000)},
+        }
+        self.edges: dict[str, list[str]] = {f"{page_id}/posts": []}
+        self.uploads: dict[str, dict[str, int]] = {}
+
+        start = 1700000000
+        for n in range(posts):
+            post = self._create_post(f"Simulated post {n}", start + n * 3600)
+            for c in range(comments_per_post):
+                self._create_comment(post["id"], f"Comment {c} on post {n}", start + n * 3600 + c * 60)
+
+    def _new_id(self, prefix: str = "") -> str:
+        object_id = f"{prefix}{self._next_id}"
+        self._next_id += 1
+        return object_id
+
+    def _create_post(self, message: str, created: float = None) -> dict[str, Any]:
+        timestamp = format_time(created or time.time())
+        post = {
+            "id": self._new_id(f"{self.page_id}_"),
+            "message": message,
+            "created_time": timestamp,
+            "updated_time": timestamp,
+            "shares": {"count": self._rng.randint(0, 50)},
+            "like_count": self._rng.randint(0, 500),
+        }
+        self.objects[post["id"]] = post
+        self.edges[f"{self.page_id}/posts"].insert(0, post["id"])
+        self.edges[f"{post['id']}/comments"] = []
+        return post
+
+    def _create_comment(self, parent_id: str, message: str, created: float = None) -> dict[str, Any]:
+        user = self._rng.randint(1, 50)
+        comment = {
+            "id": self._new_id(f"{parent_id}_"),
+            "message": message,
+            "from": {"id": str(9000 + user), "name": f"User {user}"},
+            "created_time": format_time(created or time.time()),
+        }
+        self.objects[comment["id"]] = comment
+        self.edges.setdefault(f"{parent_id}/comments", []).append(comment["id"])
+        self.edges[f"{comment['id']}/comments"] = []
+        return comment
+
+    def handle(self, method: str, path: str, params: dict[str, str], body: bytes = b"") -> tuple[int, Any]:
+        """Serve one Graph call; path excludes the version prefix. Returns (status, JSON body)."""
+        parts = [p for p in path.split("/") if p]
+        with self._lock:
+            if not parts:
+                if method == "GET" and "ids" in params:
+                    return self._get_ids(params)
+                return 400, graph_error("Unsupported request", 100)
+            if parts == ["me", "messages"] and method == "POST":
+                return 200, {"recipient_id": json.loads(body or b"{}").get("recipient", {}).get("id"),
+                             "message_id": self._new_id("m_")}
+            if len(parts) == 1:
+                return self._object(method, parts[0], params)
+            if len(parts) == 2:
+                return self._edge(method, parts[0], parts[1], params, body)
+        return 400, graph_error("Unknown path", 2500)
+
+    def _get_ids(self, params: dict[str, str]) -> tuple[int, Any]:
+        result = {}
+        for object_id in params["ids"].split(","):
+            if object_id not in self.objects:
+                return 404, graph_error(f"Object with ID '{object_id}' does not exist", 100)
+            result[object_id] = self._project(self.objects[object_id], params.get("fields"))
+        return 200, result
+
+    def _object(self, method: str, object_id: str, params: dict[str, str]) -> tuple[int, Any]:
+        obj = self.objects.get(object_id)
+        if obj is None:
+            return 404, graph_error(f"Object with ID '{object_id}' does not exist", 100)
+        if method == "GET":
+            return 200, self._project(obj, params.get("fields"))
+        if method == "POST":
+            if "message" in params:
+                obj["message"] = params["message"]
+                obj["updated_time"] = format_time(time.time())
+            return 200, {"success": True}
+        if method == "DELETE":
+            del self.objects[object_id]
+            for ids in self.edges.values():
+                if object_id in ids:
+                    ids.remove(object_id)
+            return 200, {"success": True}
+        return 400, graph_error("Unsupported method", 100)
+
+    def _edge(self, method: str, object_id: str, edge: str, params: dict[str, str], body: bytes) -> tuple[int, Any]:
+        if object_id not in self.objects:
+            return 404, graph_error(f"Object with ID '{object_id}' does not exist", 100)
+        if edge == "feed":
+            edge = "posts"
+        if edge == "insights" and method == "GET":
+            return 200, self._insights(object_id, params)
+        if edge == "videos" and method == "POST":
+            return self._video_upload(params, body)
+        if edge == "photos" and method == "POST":
+            photo_id = self._new_id()
+            if params.get("published", "true") == "false":
+                return 200, {"id": photo_id}
+            return 200, {"id": photo_id, "post_id": self._create_post(params.get("caption", ""))["id"]}
+        if method == "POST" and edge == "posts":
+            return 200, {"id": self._create_post(params.get("message", ""))["id"]}
+        if method == "POST" and edge == "comments":
+            return 200, {"id": self._create_comment(object_id, params.get("message", ""))["id"]}
+        if method == "GET" and f"{object_id}/{edge}" in self.edges:
+            return 200, self._page(self.edges[f"{object_id}/{edge}"], params)
+        return 400, graph_error(f"Unsupported edge: {edge}", 100)
+
+    def _page(self, ids: list[str], params: dict[str, str]) -> dict[str, Any]:
+        limit = int(params.get("limit", DEFAULT_PAGE_SIZE))
+        start = decode_cursor(params["after"]) + 1 if "after" in params else 0
+        window = ids[start:start + limit]
+        result = {"data": [self._project(self.objects[i], params.get("fields")) for i in window]}
+        if window:
+            result["paging"] = {"cursors": {"before": encode_cursor(start), "after": encode_cursor(start + len(window) - 1)}}
+            if start + len(window) < len(ids):
+                result["paging"]["next"] = f"?after={encode_cursor(start + len(window) - 1)}&limit={limit}"
+        return result
+
+    def _insights(self, object_id: str, params: dict[str, str]) -> dict[str, Any]:
+        rng = random.Random(f"{object_id}:{params.get('metric')}")
+        period = params.get("period", "lifetime")
+        fields = split_fields(params["fields"]) if params.get("fields") else None
+        return {"data": [{k: v for k, v in record.items() if not fields or k in fields} for record in [{
+            "name": metric,
+            "period": period,
+            "values": [{"value": rng.randint(0, 10000)}],
+            "title": metric.replace("_", " ").title(),
+            "description": f"Simulated {metric}",
+            "id": f"{object_id}/insights/{metric}/{period}",
+        } for metric in params.get("metric", "").split(",") if metric in INSIGHT_METRICS]]}
+
+    def _video_upload(self, params: dict[str, str], body: bytes) -> tuple[int, Any]:
+        # Transfer fields arrive inside the multipart body
+        params = {**params, **multipart_fields(body)}
+        phase = params.get("upload_phase")
+        if phase == "start":
+            session_id = self._new_id("session_")
+            size = int(params["file_size"])
+            self.uploads[session_id] = {"size": size}
+            return 200, {"upload_session_id": session_id, "video_id": self._new_id(),
+                         "start_offset": "0", "end_offset": str(min(size, VIDEO_CHUNK_SIZE))}
+        session = self.uploads.get(params.get("upload_session_id"))
+        if session is None:
+            return 400, graph_error("Invalid upload session", 6000)
+        if phase == "transfer":
+            start = int(params["start_offset"]) + VIDEO_CHUNK_SIZE
+            start = min(start, session["size"])
+            return 200, {"start_offset": str(start), "end_offset": str(min(session["size"], start + VIDEO_CHUNK_SIZE))}
+        if phase == "finish":
+            del self.uploads[params["upload_session_id"]]
+            return 200, {"success": True}
+        return 400, graph_error("Unknown upload phase", 100)
+
+    @staticmethod
+    def _project(obj: dict[str, Any], fields: str = None) -> dict[str, Any]:
+        if not fields:
+            return {k: v for k, v in obj.items() if k in ("id", "name", "message", "created_time")}
+        result = {"id": obj["id"]}
+        for field in split_fields(fields):
+            name = field.split(".")[0].split("{")[0]
+            if name == "likes":
+                result["likes"] = {"data": [], "summary": {"total_count": obj.get("like_count", 0)}}
+            elif name in obj:
+                result[name] = obj[name]
+        return result
+
+
+class RateLimitWindow:
+    """Sliding window of calls per access token, reported like X-App-Usage."""
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self._calls: dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def hit(self, token: str) -> int:
+        """Record a call and return usage as a percentage of the budget."""
+        now = time.monotonic()
+        with self._lock:
+            calls = self._calls.setdefault(token, deque())
+            while calls and calls[0] <= now - self.window:
+                calls.popleft()
+            calls.append(now)
+            return int(len(calls) * 100 / self.limit)
+
+
+class GraphSimulator:
+    def __init__(self, store: GraphStore = None, latency: Latency = None, error_rate: float = 0.0,
+                 rate_limit: int = 100000, rate_window: float = 60.0, seed: int = 0,
+                 host: str = "127.0.0.1", port: int = 0, version: str = "v22.0"):
+        self.store = store or GraphStore(seed=seed)
+        self.latency = latency or Latency()
+        self.error_rate = error_rate
+        self.usage = RateLimitWindow(rate_limit, rate_window)
+        self.version = version
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/{self.version}"
+
+    def start(self) -> "GraphSimulator":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="graph-simulator", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def call(self, method: str, path: str, params: dict[str, str], body: bytes = b"") -> tuple[int, dict[str, str], Any]:
+        """Run one call through error injection, rate limiting and the store."""
+        headers = {}
+        usage = self.usage.hit(params.get("access_token", ""))
+        headers["X-App-Usage"] = json.dumps({"call_count": min(usage, 100), "total_cputime": 0, "total_time": 0})
+        if usage > 100:
+            status, error = RATE_LIMIT_ERROR
+            return status, headers, {"error": error}
+        with self._rng_lock:
+            failed = self._rng.random() < self.error_rate
+            injected = self._rng.choice(INJECTED_ERRORS)
+        if failed:
+            return injected[0], headers, {"error": injected[1]}
+
+        if path.strip("/") == "" and method == "POST" and "batch" in params:
+            return 200, headers, self._batch(json.loads(params["batch"]), params.get("access_token", ""))
+        status, payload = self.store.handle(method, path, params, body)
+        return status, headers, payload
+
+    def _batch(self, operations: list[dict[str, Any]], token: str) -> list[dict[str, Any]]:
+        responses = []
+        for operation in operations:
+            url = urlsplit(operation["relative_url"])
+            path = url.path.removeprefix(f"/{self.version}").removeprefix(f"{self.version}/")
+            params = {**dict(parse_qsl(url.query)), **dict(parse_qsl(operation.get("body", ""))), "access_token": token}
+            status, payload = self.store.handle(operation["method"].upper(), path, params)
+            responses.append({"code": status, "headers": [], "body": json.dumps(payload)})
+        return responses
+
+    def _handler_class(self):
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are separate writes; with Nagle on, delayed ACKs add ~40 ms per response
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _serve(self):
+                time.sleep(simulator.latency.sample() / 1000)
+                url = urlsplit(self.path)
+                prefix = f"/{simulator.version}"
+                path = url.path[len(prefix):] if url.path.startswith(prefix) else url.path
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                params = dict(parse_qsl(url.query))
+                content_type = self.headers.get("Content-Type", "")
+                if content_type.startswith("application/x-www-form-urlencoded"):
+                    params.update(parse_qsl(body.decode()))
+
+                status, headers, payload = simulator.call(self.command, path, params, body)
+                encoded = json.dumps(payload).encode()
+                etag = f'"{hashlib.sha1(encoded).hexdigest()}"'
+                if self.command == "GET" and status == 200 and self.headers.get("If-None-Match") == etag:
+                    status, encoded = 304, b""
+
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                if self.command == "GET" and status in (200, 304):
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(encoded)))
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            do_GET = do_POST = do_DELETE = _serve
+
+        return Handler
+
+
+def graph_error(message: str, code: int) -> dict[str, Any]:
+    return {"error": {"message": message, "type": "GraphMethodException", "code": code}}
+
+
+def format_time(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S+0000")
+
+
+def encode_cursor(index: int) -> str:
+    return base64.urlsafe_b64encode(str(index).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+
+
+def split_fields(fields: str) -> list[str]:
+    """Split a Graph fields string on top-level commas, keeping nested {…} groups intact."""
+    result, depth, current = [], 0, ""
+    for char in fields:
+        if char == "," and depth == 0:
+            result.append(current)
+            current = ""
+            continue
+        depth += (char == "{") - (char == "}")
+        current += char
+    if current:
+        result.append(current)
+    return result
+
+
+def multipart_fields(body: bytes) -> dict[str, str]:
+    """Small text fields from a multipart body; file parts are ignored."""
+    fields = {}
+    for name, value in re.findall(rb'name="([^"]+)"\r\n\r\n([^\r]{0,256})\r\n', body[:64 * 1024]):
+        fields[name.decode()] = value.decode(errors="replace")
+    return fields
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a local Graph API simulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--page-id", default=DEFAULT_PAGE_ID)
+    parser.add_argument("--posts", type=int, default=100)
+    parser.add_argument("--comments-per-post", type=int, default=20)
+    parser.add_argument("--latency", default="fixed:0", help="e.g. fixed:20, uniform:10:50, lognormal:40:0.5")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=100000, help="calls per token per window")
+    parser.add_argument("--rate-window", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    simulator = GraphSimulator(
+        GraphStore(args.page_id, args.posts, args.comments_per_post, args.seed),
+        Latency(args.latency, args.seed), args.error_rate, args.rate_limit, args.rate_window,
+        args.seed, args.host, args.port,
+    )
+    print(f"Graph API simulator listening on {simulator.base_url}")
+    try:
+        simulator.server.serve_forever()
+    except KeyboardInterrupt:
+        simulator.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Minimal in-memory server speaking the Redis protocol, for trying RedisBackend locally.
+
+Supports the commands RedisBackend uses: PING, AUTH, SELECT, GET, SET (EX/PX/NX), DEL,
+INCR, INCRBY, PEXPIRE and FLUSHDB.
+
+    python -m benchmarks.resp_server --port 6380
+    FACEBOOK_STATE_BACKEND=redis://127.0.0.1:6380/0 python facebook_mcp_wrapper.py
+"""
+import argparse
+import socketserver
+import threading
+import time
+from typing import Any
+
+
+class RespStore:
+    def __init__(self):
+        # key -> (value, expires_at or None)
+        self._data: dict[bytes, tuple[bytes, float | None]] = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key: bytes) -> tuple[bytes, float | None] | None:
+        entry = self._data.get(key)
+        if entry and entry[1] is not None and entry[1] <= time.time():
+            del self._data[key]
+            return None
+        return entry
+
+    def execute(self, args: list[bytes]) -> Any:
+        command = args[0].upper()
+        with self._lock:
+            if command == b"PING":
+                return "PONG"
+            if command in (b"AUTH", b"SELECT"):
+                return "OK"
+            if command == b"FLUSHDB":
+                self._data.clear()
+                return "OK"
+            if command == b"GET":
+                entry = self._live(args[1])
+                return entry[0] if entry else None
+            if command == b"SET":
+                return self._set(args[1], args[2], [a.upper() for a in args[3:]], args[3:])
+            if command == b"DEL":
+                return sum(1 for key in args[1:] if self._data.pop(key, None) is not None)
+            if command in (b"INCR", b"INCRBY"):
+                amount = int(args[2]) if command == b"INCRBY" else 1
+                entry = self._live(args[1])
+                value = (int(entry[0]) if entry else 0) + amount
+                self._data[args[1]] = (str(value).encode(), entry[1] if entry else None)
+                return value
+            if command == b"PEXPIRE":
+                entry = self._live(args[1])
+                if not entry:
+                    return 0
+                self._data[args[1]] = (entry[0], time.time() + int(args[2]) / 1000)
+                return 1
+        return RuntimeError(f"ERR unknown command '{command.decode()}'")
+
+    def _set(self, key: bytes, value: bytes, options: list[bytes], raw: list[bytes]) -> Any:
+        expires_at = None
+        if b"PX" in options:
+            expires_at = time.time() + int(raw[options.index(b"PX") + 1]) / 1000
+        if b"EX" in options:
+            expires_at = time.time() + int(raw[options.index(b"EX") + 1])
+        if b"NX" in options and self._live(key) is not None:
+            return None
+        self._data[key] = (value, expires_at)
+        return "OK"
+
+
+class RespHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            count = int(line[1:-2])
+            args = []
+            for _ in range(count):
+                length = int(self.rfile.readline()[1:-2])
+                args.append(self.rfile.read(length + 2)[:-2])
+            self.wfile.write(encode(self.server.store.execute(args)))
+
+
+class RespServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), RespHandler)
+        self.store = RespStore()
+
+    def start(self) -> "RespServer":
+        threading.Thread(target=self.serve_forever, name="resp-server", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+def encode(value: Any) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, RuntimeError):
+        return f"-{value}\r\n".encode()
+    if isinstance(value, str):
+        return f"+{value}\r\n".encode()
+    if isinstance(value, int):
+        return f":{value}\r\n".encode()
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a minimal Redis-protocol server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6380)
+    args = parser.parse_args()
+    server = RespServer(args.host, args.port)
+    print(f"RESP server listening on {args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""Benchmark the MCP tools (server.py) and HTTP routes (facebook_mcp_wrapper.py) against
+the local Graph API simulator.
+
+    python -m benchmarks.run --concurrency 1,8,32 --requests 500 --latency lognormal:40:0.5
+
+Each run is saved to benchmarks/results/ and compared with the previous run; scenarios whose
+p95 latency or throughput got worse by more than --threshold are reported as regressions.
+"""
+import argparse
+import asyncio
+import glob
+import json
+import logging
+import os
+import random
+import resource
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from benchmarks.graph_simulator import DEFAULT_PAGE_ID, GraphSimulator, GraphStore, Latency
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# name -> builds tool arguments from a seeded RNG and the simulated store
+SCENARIOS: dict[str, Callable[[random.Random, GraphStore], dict[str, Any]]] = {
+    "get_page_posts": lambda rng, store: {},
+    "get_post_comments": lambda rng, store: {"post_id": random_post(rng, store)},
+    "get_post_insights": lambda rng, store: {"post_id": random_post(rng, store)},
+    "get_number_of_likes": lambda rng, store: {"post_id": random_post(rng, store)},
+    "get_post_top_commenters": lambda rng, store: {"post_id": random_post(rng, store)},
+    "post_to_facebook": lambda rng, store: {"message": f"Benchmark post {rng.random()}"},
+    "bulk_schedule_posts": lambda rng, store: {"posts": [
+        {"message": f"Scheduled {i}", "publish_time": int(time.time()) + 3600 + i} for i in range(20)
+    ]},
+}
+
+
+def random_post(rng: random.Random, store: GraphStore) -> str:
+    posts = store.edges[f"{store.page_id}/posts"]
+    return posts[rng.randrange(len(posts))]
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def max_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+class Transports:
+    """Calls a tool through FastMCP's tool dispatch or through the Flask routes."""
+
+    def __init__(self):
+        import server
+        import facebook_mcp_wrapper
+        self.mcp = server.mcp
+        self.app = facebook_mcp_wrapper.app
+        self._local = threading.local()
+
+    def mcp_call(self, name: str, arguments: dict[str, Any]) -> bool:
+        loop = getattr(self._local, "loop", None)
+        if loop is None:
+            loop = self._local.loop = asyncio.new_event_loop()
+        loop.run_until_complete(self.mcp.call_tool(name, arguments))
+        return True
+
+    def http_call(self, name: str, arguments: dict[str, Any]) -> bool:
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.post(f"/tools/{name}", json={"arguments": arguments})
+        return response.status_code == 200 and response.get_json().get("success", False)
+
+
+def run_scenario(call: Callable[[str, dict[str, Any]], bool], name: str, store: GraphStore,
+                 concurrency: int, requests: int, seed: int, trace_memory: bool) -> dict[str, Any]:
+    rng = random.Random(seed)
+    arguments = [SCENARIOS[name](rng, store) for _ in range(requests)]
+    latencies = [0.0] * requests
+    errors = 0
+    errors_lock = threading.Lock()
+
+    def one(index: int) -> None:
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            ok = call(name, arguments[index])
+        except Exception:
+            ok = False
+        latencies[index] = (time.perf_counter() - started) * 1000
+        if not ok:
+            with errors_lock:
+                errors += 1
+
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(requests)))
+    elapsed = time.perf_counter() - started
+    peak_alloc = tracemalloc.get_traced_memory()[1] / (1024 * 1024) if trace_memory else None
+    if trace_memory:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(requests / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "max_rss_mb": round(max_rss_mb(), 2),
+        "peak_alloc_mb": round(peak_alloc, 2) if peak_alloc is not None else None,
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "describe", "--always", "--dirty"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def find_regressions(current: list[dict[str, Any]], baseline: list[dict[str, Any]], threshold: float) -> list[str]:
+    previous = {(r["scenario"], r["transport"], r["concurrency"]): r for r in baseline}
+    regressions = []
+    for result in current:
+        before = previous.get((result["scenario"], result["transport"], result["concurrency"]))
+        if not before:
+            continue
+        label = f"{result['transport']}:{result['scenario']}@{result['concurrency']}"
+        if before["p95_ms"] and result["p95_ms"] > before["p95_ms"] * (1 + threshold):
+            regressions.append(f"{label} p95 {before['p95_ms']:.2f}ms -> {result['p95_ms']:.2f}ms")
+        if result["throughput_rps"] < before["throughput_rps"] * (1 - threshold):
+            regressions.append(f"{label} throughput {before['throughput_rps']:.1f} -> {result['throughput_rps']:.1f} req/s")
+    return regressions
+
+
+def latest_result(exclude: str = None) -> str | None:
+    paths = sorted(p for p in glob.glob(os.path.join(RESULTS_DIR, "*.json")) if p != exclude)
+    return paths[-1] if paths else None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark MCP tools and HTTP routes against the Graph simulator")
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario and level")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated tool names")
+    parser.add_argument("--transports", default="mcp,http", help="mcp, http or both")
+    parser.add_argument("--latency", default="fixed:20", help="simulated Graph latency distribution")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace-memory", action="store_true", help="record peak Python allocations (slower)")
+    parser.add_argument("--baseline", help="result file to compare with; defaults to the previous run")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    levels = [int(c) for c in args.concurrency.split(",")]
+    simulator = GraphSimulator(GraphStore(DEFAULT_PAGE_ID, seed=args.seed), Latency(args.latency, args.seed),
+                               error_rate=args.error_rate, seed=args.seed).start()
+
+    # Configure the server for the simulator before it is imported
+    os.environ.update({
+        "GRAPH_API_BASE_URL": simulator.base_url,
+        "GRAPH_VIDEO_API_BASE_URL": simulator.base_url,
+        "FACEBOOK_PAGE_ID": DEFAULT_PAGE_ID,
+        "FACEBOOK_ACCESS_TOKEN": "simulated-token",
+        "FACEBOOK_PAGE_RATE_LIMIT": "1000000",
+        "FACEBOOK_PAGE_RATE_BURST": "1000000",
+        "FACEBOOK_PAGE_POOL_SIZE": str(max(levels)),
+    })
+    for name in ("FACEBOOK_PAGES", "FACEBOOK_PAGES_FILE", "FACEBOOK_USER_TOKEN"):
+        os.environ.pop(name, None)
+    transports = Transports()
+    # Per-request INFO logs from the wrapper would drown the report
+    logging.disable(logging.INFO)
+    calls = {"mcp": transports.mcp_call, "http": transports.http_call}
+
+    results = []
+    print(f"{'transport':<9} {'scenario':<24} {'conc':>4} {'req/s':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'err':>5} {'rss MB':>8}")
+    for transport in args.transports.split(","):
+        for name in args.scenarios.split(","):
+            for concurrency in levels:
+                result = run_scenario(calls[transport], name, simulator.store, concurrency, args.requests,
+                                      args.seed, args.trace_memory)
+                results.append({"scenario": name, "transport": transport, "concurrency": concurrency, **result})
+                print(f"{transport:<9} {name:<24} {concurrency:>4} {result['throughput_rps']:>9.1f} "
+                      f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+                      f"{result['errors']:>5} {result['max_rss_mb']:>8.1f}")
+    simulator.stop()
+
+    baseline_path = args.baseline or latest_result()
+    report = {
+        "revision": git_revision(),
+        "timestamp": int(time.time()),
+        "python": sys.version.split()[0],
+        "config": {k: v for k, v in vars(args).items() if k not in ("baseline", "fail_on_regression", "no_save")},
+        "results": results,
+    }
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{report['revision']}.json")
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved results to {path}")
+
+    if not baseline_path:
+        return 0
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    if baseline.get("config") != report["config"]:
+        print(f"Baseline {baseline_path} used different settings; comparison may not be meaningful")
+    regressions = find_regressions(results, baseline["results"], args.threshold)
+    print(f"Compared with {baseline_path} ({baseline.get('revision')}): "
+          f"{len(regressions) or 'no'} regression{'s' if len(regressions) != 1 else ''}")
+    for regression in regressions:
+        print(f"  {regression}")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
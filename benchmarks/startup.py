@@ -0,0 +1,103 @@
+"""Measure cold-start time of server.py and facebook_mcp_wrapper.py and enforce a budget.
+
+    python -m benchmarks.startup --runs 10
+    python -m benchmarks.startup --importtime facebook_mcp_wrapper
+
+Each run imports the module in a fresh interpreter. The run fails (exit 1) when the median import
+time exceeds the target's budget (BUDGET_MS, or --budget-ms for every target), or when a module
+that should only load on the first tool call (the HTTP client, the state backends, the Graph
+client) was imported at startup. tests/test_startup.py runs the same check.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TARGETS = ("server", "facebook_mcp_wrapper")
+# Median cold-start budget per entry point, in milliseconds. Measured medians are about 210ms for
+# the wrapper and 830ms for the server; the budgets leave some headroom for slower hosts
+BUDGET_MS = {"server": 1000, "facebook_mcp_wrapper": 300}
+# Loaded by the first tool call, never by importing an entry point (python-dotenv is also
+# skipped, but only when there is no .env to load)
+DEFERRED_MODULES = ("requests", "sqlite3", "facebook_api", "tenancy", "tokens", "backends")
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {target}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [m for m in {deferred!r} if m in sys.modules]}}))
+"""
+
+
+def probe(target: str, env: dict[str, str]) -> dict[str, object]:
+    code = PROBE.format(target=target, deferred=DEFERRED_MODULES)
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True,
+                            check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure(target: str, runs: int, env: dict[str, str] = None) -> dict[str, object]:
+    """Median, min and max import time over `runs` fresh interpreters, and deferred modules that loaded."""
+    env = env or {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    results = [probe(target, env) for _ in range(runs)]
+    times = [r["ms"] for r in results]
+    return {
+        "median_ms": statistics.median(times),
+        "min_ms": min(times),
+        "max_ms": max(times),
+        "loaded": sorted({m for r in results for m in r["loaded"]}),
+    }
+
+
+def importtime(target: str, env: dict[str, str], top: int) -> list[tuple[int, str]]:
+    """Slowest imports by cumulative microseconds, from python -X importtime."""
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {target}"], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure and enforce the cold-start budget")
+    parser.add_argument("--targets", default=",".join(TARGETS), help="comma-separated modules to import")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per target")
+    parser.add_argument("--budget-ms", type=float, help="maximum median import time (default: per-target BUDGET_MS)")
+    parser.add_argument("--importtime", metavar="TARGET", help="print the slowest imports of TARGET and exit")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    if args.importtime:
+        for cumulative, name in importtime(args.importtime, env, args.top):
+            print(f"{cumulative / 1000:>9.1f} ms  {name}")
+        return 0
+
+    failures = []
+    print(f"{'target':<22} {'median':>9} {'min':>9} {'max':>9}  deferred modules loaded")
+    for target in args.targets.split(","):
+        result = measure(target, args.runs, env)
+        median, loaded = result["median_ms"], result["loaded"]
+        print(f"{target:<22} {median:>7.1f}ms {result['min_ms']:>7.1f}ms {result['max_ms']:>7.1f}ms  "
+              f"{', '.join(loaded) or '-'}")
+        budget = BUDGET_MS[target] if args.budget_ms is None else args.budget_ms
+        if median > budget:
+            failures.append(f"{target} median {median:.1f}ms exceeds budget {budget:.0f}ms")
+        if loaded:
+            failures.append(f"{target} imports {', '.join(loaded)} at startup")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from urllib.parse import urlencode
+import requests
+from urllib3.exceptions import NewConnectionError
+
+# Graph API accepts at most 50 operations per batch request
+BATCH_SIZE = 50
+MAX_PARALLEL_BATCHES = 4
+
+# Facebook only accepts scheduled_publish_time between 10 minutes and 30 days ahead
+MIN_SCHEDULE_LEAD = 10 * 60
+MAX_SCHEDULE_LEAD = 30 * 24 * 60 * 60
+
+# How long published (or possibly published) keys are remembered, and how long a key may stay
+# claimed by a submission
+DEDUP_TTL = 30 * 24 * 60 * 60
+INFLIGHT_TTL = 10 * 60
+
+
+def validate_publish_time(publish_time: Any, now: float = None) -> str | None:
+    """Return an error message if publish_time is outside Facebook's scheduling window."""
+    if isinstance(publish_time, bool) or not isinstance(publish_time, int):
+        return "publish_time must be an integer Unix timestamp"
+    now = time.time() if now is None else now
+    if publish_time < now + MIN_SCHEDULE_LEAD:
+        return "publish_time must be at least 10 minutes in the future"
+    if publish_time > now + MAX_SCHEDULE_LEAD:
+        return "publish_time must be at most 30 days in the future"
+    return None
+
+
+def not_sent(error: requests.exceptions.RequestException) -> bool:
+    """Whether a request certainly never reached Graph: the connection itself could not be made."""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(error, requests.exceptions.ConnectionError) and isinstance(reason, NewConnectionError)
+
+
+class BulkPublisher:
+    def __init__(self, api):
+        self.api = api
+        # Successful results by client-supplied key live in the page's state backend, so a
+        # resubmitted batch never double-posts, whichever worker receives it
+        self.state = api.state
+
+    def publish(self, posts: list[dict[str, Any]], scheduled: bool) -> dict[str, Any]:
+        results: list[dict[str, Any] | None] = [None] * len(posts)
+        pending: list[tuple[int, dict[str, Any]]] = []
+        claimed: list[str] = []
+        now = time.time()
+
+        try:
+            for index, post in enumerate(posts):
+                key = post.get("key")
+                error = self._validate(post, scheduled, now)
+                submitted = self.state.get(f"bulk:done:{key}") if key is not None and not error else None
+                if error:
+                    results[index] = {"index": index, "key": key, "success": False, "error": error}
+                elif submitted:
+                    results[index] = {**submitted, "index": index, "deduplicated": True}
+                elif key is not None and not self.state.add(f"bulk:inflight:{key}", 1, INFLIGHT_TTL):
+                    results[index] = {"index": index, "key": key, "success": False,
+                                      "error": f"Post with key {key!r} is already being submitted"}
+                else:
+                    if key is not None:
+                        # Recorded before any further backend call, so the finally block releases it
+                        claimed.append(key)
+                        # Another worker may have finished this key between the lookup and the claim
+                        submitted = self.state.get(f"bulk:done:{key}")
+                    if submitted:
+                        results[index] = {**submitted, "index": index, "deduplicated": True}
+                    else:
+                        pending.append((index, self._operation(post, scheduled)))
+
+            chunks = [pending[i:i + BATCH_SIZE] for i in range(0, len(pending), BATCH_SIZE)]
+            with ThreadPoolExecutor(max_workers=MAX_PARALLEL_BATCHES) as executor:
+                for chunk, responses in zip(chunks, executor.map(self._submit_chunk, chunks)):
+                    for (index, _), result in zip(chunk, responses):
+                        results[index] = {"index": index, "key": posts[index].get("key"), **result}
+        finally:
+            for result in results:
+                # A post whose outcome is unknown is remembered too, so a retry cannot post it twice
+                if (result and (result.get("success") or result.get("unknown")) and not result.get("deduplicated")
+                        and result.get("key") in claimed):
+                    self.state.set(f"bulk:done:{result['key']}", result, DEDUP_TTL)
+            for key in claimed:
+                self.state.delete(f"bulk:inflight:{key}")
+
+        succeeded = sum(1 for r in results if r["success"])
+        return {
+            "total": len(results),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "results": results,
+        }
+
+    def _validate(self, post: dict[str, Any], scheduled: bool, now: float) -> str | None:
+        if not post.get("message") and not post.get("image_url"):
+            return "Each post requires a message or an image_url"
+        if scheduled:
+            return validate_publish_time(post.get("publish_time"), now)
+        return None
+
+    def _operation(self, post: dict[str, Any], scheduled: bool) -> dict[str, Any]:
+        if post.get("image_url"):
+            endpoint = f"{self.api.page_id}/photos"
+            body = {"url": post["image_url"], "caption": post.get("message", "")}
+        else:
+            endpoint = f"{self.api.page_id}/feed"
+            body = {"message": post["message"]}
+        if scheduled:
+            body["published"] = "false"
+            body["scheduled_publish_time"] = post["publish_time"]
+        return {"method": "POST", "relative_url": endpoint, "body": urlencode(body)}
+
+    def _submit_chunk(self, chunk: list[tuple[int, dict[str, Any]]]) -> list[dict[str, Any]]:
+        try:
+            responses = self.api.batch([operation for _, operation in chunk])
+        except requests.exceptions.RequestException as e:
+            if not_sent(e):
+                return [{"success": False, "error": str(e)} for _ in chunk]
+            # The batch may have reached Graph (timeout, reset mid-response), so any post may be published
+            return [{"success": False, "unknown": True, "error": f"{str(e)}; posts may still be published"}
+                    for _ in chunk]
+        except Exception as e:
+            # Raised by this process before anything was sent (token lookup, rate limiter)
+            return [{"success": False, "error": str(e)} for _ in chunk]
+
+        if not isinstance(responses, list):
+            message = responses.get("error", {}).get("message", "Batch request failed")
+            return [{"success": False, "error": message} for _ in chunk]
+
+        responses = responses + [None] * (len(chunk) - len(responses))
+        return [self._parse_response(response) for response in responses]
+
+    @staticmethod
+    def _parse_response(response: dict[str, Any] | None) -> dict[str, Any]:
+        # Graph returns null for operations that did not complete in time
+        if response is None:
+            return {"success": False, "unknown": True,
+                    "error": "Operation timed out and may still be published; resubmit with a new key to post again"}
+        try:
+            body = json.loads(response.get("body") or "{}")
+        except ValueError:
+            body = {}
+        if response.get("code") == 200 and "error" not in body:
+            return {"success": True, "data": body}
+        return {"success": False, "error": body.get("error", {}).get("message", f"HTTP {response.get('code')}")}
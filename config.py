@@ -1,10 +1,65 @@
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+
+def find_env_file() -> str | None:
+    """Nearest .env in this directory or a parent, as python-dotenv's load_dotenv() would find it."""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, ".env")
+        if os.path.isfile(path):
+            return path
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+# Deployments that set real environment variables have no .env, and skip importing python-dotenv
+ENV_FILE = find_env_file()
+if ENV_FILE:
+    from dotenv import load_dotenv
+    load_dotenv(ENV_FILE)
 
 # Facebook Graph API setup
 GRAPH_API_VERSION = "v22.0"
-PAGE_ACCESS_TOKEN = "EAAUWYNZCUnEIBOZBFTU1pi6lDNCPgucpHm5UQFYyGbOoaH5bodOY6wxbHarWXlvgVvwIj0TMLl42YHBvgJY5t9AN0Tx2sxcsZBPD4nhApPXO2CKJ0iZC8cQqOK8m1hZB0t4q0qvPnov0Ma8ZBHsuHjqLLPRtv2EwnnULoTwsgPgTOfBzSZBJ2ZC5yz8ujtwyDk9vZAzK3ZCcRYSQq3CXxtvT4bxt4x"
-PAGE_ID = "656318050906692"
-GRAPH_API_BASE_URL = f"https://graph.facebook.com/{GRAPH_API_VERSION}"
\ No newline at end of file
+PAGE_ACCESS_TOKEN = os.getenv("FACEBOOK_ACCESS_TOKEN", "EAAUWYNZCUnEIBOZBFTU1pi6lDNCPgucpHm5UQFYyGbOoaH5bodOY6wxbHarWXlvgVvwIj0TMLl42YHBvgJY5t9AN0Tx2sxcsZBPD4nhApPXO2CKJ0iZC8cQqOK8m1hZB0t4q0qvPnov0Ma8ZBHsuHjqLLPRtv2EwnnULoTwsgPgTOfBzSZBJ2ZC5yz8ujtwyDk9vZAzK3ZCcRYSQq3CXxtvT4bxt4x")
+PAGE_ID = os.getenv("FACEBOOK_PAGE_ID", "656318050906692")
+# The defaults above only apply to single-page setups; with FACEBOOK_PAGES the page must be set explicitly
+PAGE_ID_CONFIGURED = "FACEBOOK_PAGE_ID" in os.environ
+# Both can be pointed at a local Graph API simulator (see benchmarks/graph_simulator.py)
+GRAPH_API_BASE_URL = os.getenv("GRAPH_API_BASE_URL", f"https://graph.facebook.com/{GRAPH_API_VERSION}")
+GRAPH_VIDEO_API_BASE_URL = os.getenv("GRAPH_VIDEO_API_BASE_URL", f"https://graph-video.facebook.com/{GRAPH_API_VERSION}")
+
+# Multi-page setup: JSON in FACEBOOK_PAGES or a JSON file at FACEBOOK_PAGES_FILE
+PAGES_JSON = os.getenv("FACEBOOK_PAGES")
+PAGES_FILE = os.getenv("FACEBOOK_PAGES_FILE")
+
+# Per-page request budget and connection pool size
+PAGE_RATE_LIMIT = float(os.getenv("FACEBOOK_PAGE_RATE_LIMIT", "10"))
+PAGE_RATE_BURST = int(os.getenv("FACEBOOK_PAGE_RATE_BURST", "20"))
+PAGE_POOL_SIZE = int(os.getenv("FACEBOOK_PAGE_POOL_SIZE", "10"))
+# Seconds to wait for Graph to accept a connection and, separately, for each read of a response
+REQUEST_TIMEOUT = float(os.getenv("FACEBOOK_REQUEST_TIMEOUT", "30"))
+
+# Token lifecycle: with an app and a user token, page tokens are resolved and refreshed automatically
+APP_ID = os.getenv("FACEBOOK_APP_ID")
+APP_SECRET = os.getenv("FACEBOOK_APP_SECRET")
+USER_ACCESS_TOKEN = os.getenv("FACEBOOK_USER_TOKEN")
+TOKEN_CACHE_FILE = os.getenv("FACEBOOK_TOKEN_CACHE", ".facebook_tokens.json")
+
+# Where caches, rate-limit budgets and bulk job state live: "memory" (per process),
+# "sqlite:///path.db" (shared by workers on one host) or "redis://host:6379/0" (shared across hosts)
+STATE_BACKEND = os.getenv("FACEBOOK_STATE_BACKEND", "memory")
+
+# Admission control for the HTTP wrapper: tool calls running at once, calls waiting for a slot,
+# running plus waiting calls per client, and how long a call may wait without an X-Deadline-Ms header
+MAX_CONCURRENT_CALLS = int(os.getenv("WRAPPER_MAX_CONCURRENT", "16"))
+MAX_QUEUED_CALLS = int(os.getenv("WRAPPER_MAX_QUEUE", "64"))
+MAX_CALLS_PER_CLIENT = int(os.getenv("WRAPPER_MAX_PER_CLIENT", "8"))
+QUEUE_TIMEOUT = float(os.getenv("WRAPPER_QUEUE_TIMEOUT", "10"))
+# Reverse proxies in front of the wrapper (1 on Render). Their X-Forwarded-For gives the client address
+# used as the fairness key; leave at 0 when clients connect directly, so the header cannot be spoofed
+TRUSTED_PROXIES = int(os.getenv("WRAPPER_TRUSTED_PROXIES", "0"))
+
+# HTTP wrapper clients may only upload files from this directory; path uploads are disabled when unset
+UPLOAD_DIR = os.getenv("FACEBOOK_UPLOAD_DIR")
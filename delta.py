@@ -0,0 +1,64 @@
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Any
+from backends import MemoryBackend, StateBackend
+
+# Versions of a scope that is no longer polled are forgotten after a week
+DELTA_TTL = 7 * 24 * 3600
+
+
+def content_hash(item: dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(item, sort_keys=True).encode()).hexdigest()
+
+
+def item_time(item: dict[str, Any]) -> float | None:
+    """Unix time of the last edit Graph reports for an item, if any."""
+    value = item.get("updated_time") or item.get("created_time")
+    if not value:
+        return None
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S%z").timestamp()
+
+
+class DeltaTracker:
+    """Remembers which version of each post or comment was seen, and when.
+
+    A changed_since cursor is the Unix time of a previous read. Items are returned when their
+    current content was first observed after the cursor. Edits are detected by content hash. Items
+    and edits are dated by when a worker first saw them; only on a scope's first poll are items
+    dated by their Graph timestamp, which is second-precision and on Facebook's clock, not ours.
+    Versions live in the state backend, so cursors work across workers sharing it.
+    """
+
+    def __init__(self, state: StateBackend = None):
+        # delta:<scope> -> item ID -> [content hash, time this version was first observed]
+        self.state = state or MemoryBackend()
+        self._lock = threading.Lock()
+
+    def changes(self, scope: str, items: list[dict[str, Any]], changed_since: float) -> dict[str, Any]:
+        now = time.time()
+        changed = []
+        with self._lock:
+            stored = self.state.get(f"delta:{scope}")
+            known = stored or {}
+            current = {}
+            for item in items:
+                digest = content_hash(item)
+                previous = known.get(item.get("id"))
+                if previous and previous[0] == digest:
+                    observed = previous[1]
+                elif previous:
+                    observed = now
+                elif stored is None:
+                    observed = item_time(item) or now
+                else:
+                    # New since the last poll, whatever its created_time says (clock skew, late arrivals)
+                    observed = now
+                current[item.get("id")] = [digest, observed]
+                if observed > changed_since:
+                    changed.append(item)
+            # Only the latest window is kept, so memory stays bounded by the page size
+            self.state.set(f"delta:{scope}", current, DELTA_TTL)
+        return {"data": changed, "cursor": now}
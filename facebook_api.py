@@ -1,27 +1,118 @@
+import hashlib
+import json
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
-from config import GRAPH_API_BASE_URL, PAGE_ID, PAGE_ACCESS_TOKEN
+from requests.adapters import HTTPAdapter
+from config import (GRAPH_API_BASE_URL, GRAPH_VIDEO_API_BASE_URL, PAGE_ID, PAGE_ACCESS_TOKEN,
+                    PAGE_POOL_SIZE, PAGE_RATE_BURST, PAGE_RATE_LIMIT, REQUEST_TIMEOUT)
+from backends import MEMORY_CACHE_SIZE, MemoryBackend, StateBackend
+from delta import DeltaTracker
+from projection import graph_fields, with_fields
+from ratelimit import RateLimiter
+from tokens import TokenManager
+from uploads import FileWindow, MultipartStream, open_source, source_name
+
+POST_FIELDS = ["id", "message", "created_time", "updated_time"]
+COMMENT_FIELDS = ["id", "message", "from", "created_time"]
+
+MAX_PARALLEL_UPLOADS = 4
+# Retries per chunk before a resumable video upload gives up
+CHUNK_RETRIES = 3
+# Cached GET responses are dropped after a day without being revalidated
+RESPONSE_TTL = 24 * 3600
 
 
 class FacebookAPI:
+    def __init__(self, page_id: str = PAGE_ID, access_token: str = PAGE_ACCESS_TOKEN,
+                 rate_limiter: RateLimiter = None, pool_size: int = PAGE_POOL_SIZE, token_manager: TokenManager = None,
+                 state: StateBackend = None, cache: StateBackend = None, timeout: float = REQUEST_TIMEOUT):
+        self.page_id = page_id
+        self.access_token = access_token
+        self.token_manager = token_manager
+        self.rate_limiter = rate_limiter or RateLimiter(PAGE_RATE_LIMIT, PAGE_RATE_BURST)
+        # Each page keeps its own keep-alive connection pool
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # Change tracking and bulk job state, which must not be evicted; shared when the backend is
+        self.state = state or MemoryBackend()
+        self.deltas = DeltaTracker(self.state)
+        # Cached GET responses, which may be evicted at any time
+        self.cache = cache or MemoryBackend(MEMORY_CACHE_SIZE)
+
+    # Managed tokens are refreshed in the background; the configured token is the fallback
+    def _access_token(self) -> str:
+        if self.token_manager:
+            return self.token_manager.get_page_token(self.page_id, self.access_token)
+        return self.access_token
+
     # Generic Graph API request method
-    def _request(self, method: str, endpoint: str, params: dict[str, Any], json: dict[str, Any] = None) -> dict[str, Any]:
-        url = f"{GRAPH_API_BASE_URL}/{endpoint}"
-        params["access_token"] = PAGE_ACCESS_TOKEN
-        response = requests.request(method, url, params=params, json=json)
-        return response.json()
+    def _request(self, method: str, endpoint: str, params: dict[str, Any], json: dict[str, Any] = None,
+                 data: Any = None, headers: dict[str, str] = None, base_url: str = GRAPH_API_BASE_URL) -> dict[str, Any]:
+        if method == "GET" and json is None and data is None:
+            return self._conditional_get(endpoint, params, base_url)
+        return self._send(method, endpoint, params, json=json, data=data, headers=headers, base_url=base_url).json()
+
+    def _send(self, method: str, endpoint: str, params: dict[str, Any], base_url: str = GRAPH_API_BASE_URL,
+              **kwargs) -> requests.Response:
+        url = f"{base_url}/{endpoint}" if endpoint else base_url
+        params["access_token"] = self._access_token()
+        self.rate_limiter.acquire()
+        return self.session.request(method, url, params=params, timeout=self.timeout, **kwargs)
+
+    # Revalidate with If-None-Match; an unchanged body is served from the cached parse
+    def _conditional_get(self, endpoint: str, params: dict[str, Any], base_url: str) -> dict[str, Any]:
+        request = f"{base_url}/{endpoint}?{json.dumps(params, sort_keys=True, default=str)}"
+        key = f"response:{hashlib.sha1(request.encode()).hexdigest()}"
+        cached = self.cache.get(key)
+        headers = {"If-None-Match": cached["etag"]} if cached and cached["etag"] else None
+
+        response = self._send("GET", endpoint, params, headers=headers, base_url=base_url)
+        if cached and response.status_code == 304:
+            return cached["data"]
+        digest = hashlib.sha1(response.content).hexdigest()
+        if cached and cached["hash"] == digest:
+            return cached["data"]
+
+        data = response.json()
+        if isinstance(data, dict) and "error" not in data:
+            self.cache.set(key, {"etag": response.headers.get("ETag"), "hash": digest, "data": data}, RESPONSE_TTL)
+        return data
+
+    # Streamed multipart upload of a single file field
+    def _upload(self, endpoint: str, params: dict[str, Any], file_field: str, content: FileWindow, filename: str,
+                base_url: str = GRAPH_API_BASE_URL) -> dict[str, Any]:
+        body = MultipartStream(params, file_field, content, filename)
+        return self._request("POST", endpoint, {}, data=body, headers={"Content-Type": body.content_type}, base_url=base_url)
+
+    # Graph batch request; each operation is {"method", "relative_url", "body"}
+    def batch(self, operations: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        return self._request("POST", "", {"batch": json.dumps(operations)})
 
     def post_message(self, message: str) -> dict[str, Any]:
-        return self._request("POST", f"{PAGE_ID}/feed", {"message": message})
+        return self._request("POST", f"{self.page_id}/feed", {"message": message})
 
     def reply_to_comment(self, comment_id: str, message: str) -> dict[str, Any]:
         return self._request("POST", f"{comment_id}/comments", {"message": message})
 
-    def get_posts(self) -> dict[str, Any]:
-        return self._request("GET", f"{PAGE_ID}/posts", {"fields": "id,message,created_time"})
+    # With changed_since, only posts new or edited after that cursor are returned, plus a new cursor.
+    # fields (dotted paths) narrows what Graph sends back.
+    def get_posts(self, changed_since: float = None, fields: list[str] = None) -> dict[str, Any]:
+        fields = with_fields(fields, ["id", "created_time", "updated_time"]) or POST_FIELDS
+        data = self._request("GET", f"{self.page_id}/posts", {"fields": graph_fields(fields)})
+        if changed_since is None or "error" in data:
+            return data
+        return self.deltas.changes(f"posts:{','.join(fields)}", data.get("data", []), changed_since)
 
-    def get_comments(self, post_id: str) -> dict[str, Any]:
-        return self._request("GET", f"{post_id}/comments", {"fields": "id,message,from,created_time"})
+    def get_comments(self, post_id: str, changed_since: float = None, fields: list[str] = None) -> dict[str, Any]:
+        fields = with_fields(fields, ["id", "created_time"]) or COMMENT_FIELDS
+        data = self._request("GET", f"{post_id}/comments", {"fields": graph_fields(fields)})
+        if changed_since is None or "error" in data:
+            return data
+        return self.deltas.changes(f"comments:{post_id}:{','.join(fields)}", data.get("data", []), changed_since)
 
     def delete_post(self, post_id: str) -> dict[str, Any]:
         return self._request("DELETE", f"{post_id}", {})
@@ -29,19 +120,89 @@ class FacebookAPI:
     def delete_comment(self, comment_id: str) -> dict[str, Any]:
         return self._request("DELETE", f"{comment_id}", {})
 
-    def get_insights(self, post_id: str, metric: str, period: str = "lifetime") -> dict[str, Any]:
-        return self._request("GET", f"{post_id}/insights", {"metric": metric, "period": period})
+    def get_insights(self, post_id: str, metric: str, period: str = "lifetime", fields: list[str] = None) -> dict[str, Any]:
+        params = {"metric": metric, "period": period}
+        if fields:
+            params["fields"] = graph_fields(fields)
+        return self._request("GET", f"{post_id}/insights", params)
 
-    def get_bulk_insights(self, post_id: str, metrics: list[str], period: str = "lifetime") -> dict[str, Any]:
+    def get_bulk_insights(self, post_id: str, metrics: list[str], period: str = "lifetime",
+                          fields: list[str] = None) -> dict[str, Any]:
         metric_str = ",".join(metrics)
-        return self.get_insights(post_id, metric_str, period)
+        return self.get_insights(post_id, metric_str, period, fields)
 
     def post_image_to_facebook(self, image_url: str, caption: str) -> dict[str, Any]:
         params = {
             "url": image_url,
             "caption": caption
         }
-        return self._request("POST", f"{PAGE_ID}/photos", params)
+        return self._request("POST", f"{self.page_id}/photos", params)
+
+    # Upload a photo from a local path, bytes or binary stream
+    def upload_photo(self, source: Any, caption: str = "", published: bool = True) -> dict[str, Any]:
+        stream, size, should_close = open_source(source)
+        try:
+            params = {"caption": caption, "published": str(published).lower()}
+            content = FileWindow(stream, stream.tell(), size)
+            return self._upload(f"{self.page_id}/photos", params, "source", content, source_name(source, "photo.jpg"))
+        finally:
+            if should_close:
+                stream.close()
+
+    # Upload photos concurrently as unpublished media, then publish one post referencing them all
+    def post_multi_photo(self, sources: list[Any], message: str) -> dict[str, Any]:
+        with ThreadPoolExecutor(max_workers=MAX_PARALLEL_UPLOADS) as executor:
+            uploads = list(executor.map(lambda source: self.upload_photo(source, published=False), sources))
+
+        if any("id" not in upload for upload in uploads):
+            return {"error": {"message": "One or more photo uploads failed"}, "uploads": uploads}
+
+        params = {"message": message}
+        for index, upload in enumerate(uploads):
+            params[f"attached_media[{index}]"] = json.dumps({"media_fbid": upload["id"]})
+        return self._request("POST", f"{self.page_id}/feed", params)
+
+    # Upload a video with the resumable upload session protocol (start, transfer chunks, finish)
+    def upload_video(self, source: Any, description: str = "", title: str = "") -> dict[str, Any]:
+        stream, size, should_close = open_source(source)
+        base = stream.tell()
+        endpoint = f"{self.page_id}/videos"
+        try:
+            session = self._request("POST", endpoint, {"upload_phase": "start", "file_size": size},
+                                    base_url=GRAPH_VIDEO_API_BASE_URL)
+            if "upload_session_id" not in session:
+                return session
+
+            session_id = session["upload_session_id"]
+            start_offset, end_offset = int(session["start_offset"]), int(session["end_offset"])
+            failures = 0
+            while start_offset < end_offset:
+                params = {"upload_phase": "transfer", "upload_session_id": session_id, "start_offset": start_offset}
+                content = FileWindow(stream, base + start_offset, end_offset - start_offset)
+                try:
+                    chunk = self._upload(endpoint, params, "video_file_chunk", content, source_name(source, "video.mp4"),
+                                         base_url=GRAPH_VIDEO_API_BASE_URL)
+                except requests.RequestException as e:
+                    chunk = {"error": {"message": str(e)}}
+
+                if "start_offset" not in chunk:
+                    # Resume from the same offset; the session stays valid between attempts
+                    failures += 1
+                    if failures > CHUNK_RETRIES:
+                        return {**chunk, "upload_session_id": session_id, "start_offset": start_offset}
+                    continue
+                failures = 0
+                start_offset, end_offset = int(chunk["start_offset"]), int(chunk["end_offset"])
+
+            return self._request("POST", endpoint, {
+                "upload_phase": "finish",
+                "upload_session_id": session_id,
+                "description": description,
+                "title": title,
+            }, base_url=GRAPH_VIDEO_API_BASE_URL)
+        finally:
+            if should_close:
+                stream.close()
     
     def send_dm_to_user(self, user_id: str, message: str) -> dict[str, Any]:
         payload = {
@@ -60,10 +221,10 @@ class FacebookAPI:
             "published": False,
             "scheduled_publish_time": publish_time,
         }
-        return self._request("POST", f"{PAGE_ID}/feed", params)
+        return self._request("POST", f"{self.page_id}/feed", params)
 
     def get_page_fan_count(self) -> int:
-        data = self._request("GET", f"{PAGE_ID}", {"fields": "fan_count"})
+        data = self._request("GET", f"{self.page_id}", {"fields": "fan_count"})
         return data.get("fan_count", 0)
 
     def get_post_share_count(self, post_id: str) -> int:
@@ -1,91 +1,180 @@
 from flask import Flask, request, jsonify
-import asyncio
 import json
 import logging
+import math
+import os
+import time
 from functools import wraps
 import traceback
+from admission import ANALYTICS, CRITICAL, NORMAL, AdmissionController, Rejected
+from werkzeug.middleware.proxy_fix import ProxyFix
+from config import (MAX_CALLS_PER_CLIENT, MAX_CONCURRENT_CALLS, MAX_QUEUED_CALLS, QUEUE_TIMEOUT, TRUSTED_PROXIES,
+                    UPLOAD_DIR)
 from manager import Manager
+from uploads import resolve_upload_path
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+if TRUSTED_PROXIES:
+    # Behind a proxy every connection comes from the proxy; take the client address it forwards
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXIES)
+
+# Tool names, descriptions and parameters served by GET /tools
+TOOLS_MANIFEST = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tools_manifest.json")
+
+# Admission priority: writes and DMs go first under load, analytics reads last, everything else between
+CRITICAL_TOOLS = {
+    "post_to_facebook", "post_image_to_facebook", "post_local_image_to_facebook", "post_multi_photo_to_facebook",
+    "post_video_to_facebook", "schedule_post", "update_post", "delete_post", "bulk_post_to_facebook",
+    "bulk_schedule_posts", "reply_to_comment", "delete_comment", "delete_comment_from_post", "send_dm_to_user",
+}
+ANALYTICS_TOOLS = {
+    "get_number_of_comments", "get_number_of_likes", "get_post_top_commenters", "get_page_fan_count",
+    "get_post_share_count", "get_post_insights", "get_post_impressions", "get_post_impressions_unique",
+    "get_post_impressions_paid", "get_post_impressions_organic", "get_post_engaged_users", "get_post_clicks",
+    "get_post_reactions_like_total", "get_post_reactions_love_total", "get_post_reactions_wow_total",
+    "get_post_reactions_haha_total", "get_post_reactions_sorry_total", "get_post_reactions_anger_total",
+}
+
+def tool_priority(tool_name):
+    if tool_name in CRITICAL_TOOLS:
+        return CRITICAL
+    if tool_name in ANALYTICS_TOOLS:
+        return ANALYTICS
+    return NORMAL
+
+class UnknownTool(LookupError):
+    """No tool with this name; the HTTP routes answer 404."""
 
 class FacebookMCPWrapper:
     def __init__(self):
-        # Initialize your Manager which handles the Facebook API
+        # Initialize your Manager which handles the Facebook API; it connects on the first tool call
         self.manager = Manager()
+        self._tools = None
+        
+        # Map tool names to manager methods
+        self.tool_mapping = {
+            # Page operations
+            "list_pages": lambda args: self.manager.list_pages(),
+            
+            # Post operations
+            "post_to_facebook": lambda args: self.manager.post_to_facebook(args.get('message'), page_id=args.get('page_id')),
+            "post_image_to_facebook": lambda args: self.manager.post_image_to_facebook(
+                args.get('image_url'), args.get('caption', ''), page_id=args.get('page_id')
+            ),
+            "post_local_image_to_facebook": lambda args: self.manager.post_local_image_to_facebook(
+                resolve_upload_path(args.get('image_path'), UPLOAD_DIR), args.get('caption', ''),
+                page_id=args.get('page_id')
+            ),
+            "post_multi_photo_to_facebook": lambda args: self.manager.post_multi_photo_to_facebook(
+                [resolve_upload_path(path, UPLOAD_DIR) for path in args.get('image_paths', [])],
+                args.get('message', ''), page_id=args.get('page_id')
+            ),
+            "post_video_to_facebook": lambda args: self.manager.post_video_to_facebook(
+                resolve_upload_path(args.get('video_path'), UPLOAD_DIR), args.get('description', ''),
+                args.get('title', ''), page_id=args.get('page_id')
+            ),
+            "schedule_post": lambda args: self.manager.schedule_post(
+                args.get('message'), args.get('publish_time'), page_id=args.get('page_id')
+            ),
+            "update_post": lambda args: self.manager.update_post(
+                args.get('post_id'), args.get('new_message'), page_id=args.get('page_id')
+            ),
+            "delete_post": lambda args: self.manager.delete_post(args.get('post_id'), page_id=args.get('page_id')),
+            "bulk_post_to_facebook": lambda args: self.manager.bulk_post_to_facebook(args.get('posts', []), page_id=args.get('page_id')),
+            "bulk_schedule_posts": lambda args: self.manager.bulk_schedule_posts(args.get('posts', []), page_id=args.get('page_id')),
+            
+            # Comment operations
+            "reply_to_comment": lambda args: self.manager.reply_to_comment(
+                args.get('post_id'), args.get('comment_id'), args.get('message'), page_id=args.get('page_id')
+            ),
+            "delete_comment": lambda args: self.manager.delete_comment(args.get('comment_id'), page_id=args.get('page_id')),
+            "delete_comment_from_post": lambda args: self.manager.delete_comment_from_post(
+                args.get('post_id'), args.get('comment_id'), page_id=args.get('page_id')
+            ),
+            "filter_negative_comments": lambda args: self.manager.filter_negative_comments(
+                args.get('comments', {})
+            ),
+            
+            # Get operations
+            "get_page_posts": lambda args: self.manager.get_page_posts(
+                args.get('changed_since'), fields=args.get('fields'), output=args.get('output', 'raw'),
+                page_id=args.get('page_id')
+            ),
+            "get_post_comments": lambda args: self.manager.get_post_comments(
+                args.get('post_id'), args.get('changed_since'), fields=args.get('fields'),
+                output=args.get('output', 'raw'), page_id=args.get('page_id')
+            ),
+            "get_number_of_comments": lambda args: self.manager.get_number_of_comments(args.get('post_id'), page_id=args.get('page_id')),
+            "get_number_of_likes": lambda args: self.manager.get_number_of_likes(args.get('post_id'), page_id=args.get('page_id')),
+            "get_post_top_commenters": lambda args: self.manager.get_post_top_commenters(
+                args.get('post_id'), output=args.get('output', 'raw'), page_id=args.get('page_id')
+            ),
+            "get_page_fan_count": lambda args: self.manager.get_page_fan_count(page_id=args.get('page_id')),
+            "get_post_share_count": lambda args: self.manager.get_post_share_count(args.get('post_id'), page_id=args.get('page_id')),
+            
+            # Insights operations
+            "get_post_insights": lambda args: self.manager.get_post_insights(
+                args.get('post_id'), fields=args.get('fields'), output=args.get('output', 'raw'), page_id=args.get('page_id')
+            ),
+            "get_post_impressions": lambda args: self.manager.get_post_impressions(
+                args.get('post_id'), fields=args.get('fields'), output=args.get('output', 'raw'), page_id=args.get('page_id')
+            ),
+            "get_post_impressions_unique": lambda args: self.manager.get_post_impressions_unique(
+                args.get('post_id'), fields=args.get('fields'), output=args.get('output', 'raw'), page_id=args.get('page_id')
+            ),
+            "get_post_impressions_paid": lambda args: self.manager.get_post_impressions_paid(
+                args.get('post_id'), fields=args.get('fields'), output=args.get('output', 'raw'), page_id=args.get('page_id')
+            ),
+            "get_post_impressions_organic": lambda args: self.manager.get_post_impressions_organic(
+                args.get('post_id'), fields=args.get('fields'), output=args.get('output', 'raw'), page_id=args.get('page_id')
+            ),
+            "get_post_engaged_users": lambda args: self.manager.get_post_engaged_users(
+                args.get('post_id'), fields=args.get('fields'), output=args.get('output', 'raw'), page_id=args.get('page_id')
+            ),
+            "get_post_clicks": lambda args: self.manager.get_post_clicks(
+                args.get('post_id'), fields=args.get('fields'), output=args.get('output', 'raw'), page_id=args.get('page_id')
+            ),
+            
+            # Reaction operations
+            "get_post_reactions_like_total": lambda args: self.manager.get_post_reactions_like_total(
+                args.get('post_id'), fields=args.get('fields'), output=args.get('output', 'raw'), page_id=args.get('page_id')
+            ),
+            "get_post_reactions_love_total": lambda args: self.manager.get_post_reactions_love_total(
+                args.get('post_id'), fields=args.get('fields'), output=args.get('output', 'raw'), page_id=args.get('page_id')
+            ),
+            "get_post_reactions_wow_total": lambda args: self.manager.get_post_reactions_wow_total(
+                args.get('post_id'), fields=args.get('fields'), output=args.get('output', 'raw'), page_id=args.get('page_id')
+            ),
+            "get_post_reactions_haha_total": lambda args: self.manager.get_post_reactions_haha_total(
+                args.get('post_id'), fields=args.get('fields'), output=args.get('output', 'raw'), page_id=args.get('page_id')
+            ),
+            "get_post_reactions_sorry_total": lambda args: self.manager.get_post_reactions_sorry_total(
+                args.get('post_id'), fields=args.get('fields'), output=args.get('output', 'raw'), page_id=args.get('page_id')
+            ),
+            "get_post_reactions_anger_total": lambda args: self.manager.get_post_reactions_anger_total(
+                args.get('post_id'), fields=args.get('fields'), output=args.get('output', 'raw'), page_id=args.get('page_id')
+            ),
+            
+            # Messaging
+            "send_dm_to_user": lambda args: self.manager.send_dm_to_user(
+                args.get('user_id'), args.get('message'), page_id=args.get('page_id')
+            ),
+        }
     
     def call_tool(self, tool_name, arguments):
         """
         Route tool calls to your Manager methods
         """
         try:
-            # Map tool names to manager methods
-            tool_mapping = {
-                # Post operations
-                "post_to_facebook": lambda args: self.manager.post_to_facebook(args.get('message')),
-                "post_image_to_facebook": lambda args: self.manager.post_image_to_facebook(
-                    args.get('image_url'), args.get('caption', '')
-                ),
-                "schedule_post": lambda args: self.manager.schedule_post(
-                    args.get('message'), args.get('publish_time')
-                ),
-                "update_post": lambda args: self.manager.update_post(
-                    args.get('post_id'), args.get('new_message')
-                ),
-                "delete_post": lambda args: self.manager.delete_post(args.get('post_id')),
-                
-                # Comment operations
-                "reply_to_comment": lambda args: self.manager.reply_to_comment(
-                    args.get('post_id'), args.get('comment_id'), args.get('message')
-                ),
-                "delete_comment": lambda args: self.manager.delete_comment(args.get('comment_id')),
-                "delete_comment_from_post": lambda args: self.manager.delete_comment_from_post(
-                    args.get('post_id'), args.get('comment_id')
-                ),
-                "filter_negative_comments": lambda args: self.manager.filter_negative_comments(
-                    args.get('comments', {})
-                ),
-                
-                # Get operations
-                "get_page_posts": lambda args: self.manager.get_page_posts(),
-                "get_post_comments": lambda args: self.manager.get_post_comments(args.get('post_id')),
-                "get_number_of_comments": lambda args: self.manager.get_number_of_comments(args.get('post_id')),
-                "get_number_of_likes": lambda args: self.manager.get_number_of_likes(args.get('post_id')),
-                "get_post_top_commenters": lambda args: self.manager.get_post_top_commenters(args.get('post_id')),
-                "get_page_fan_count": lambda args: self.manager.get_page_fan_count(),
-                "get_post_share_count": lambda args: self.manager.get_post_share_count(args.get('post_id')),
-                
-                # Insights operations
-                "get_post_insights": lambda args: self.manager.get_post_insights(args.get('post_id')),
-                "get_post_impressions": lambda args: self.manager.get_post_impressions(args.get('post_id')),
-                "get_post_impressions_unique": lambda args: self.manager.get_post_impressions_unique(args.get('post_id')),
-                "get_post_impressions_paid": lambda args: self.manager.get_post_impressions_paid(args.get('post_id')),
-                "get_post_impressions_organic": lambda args: self.manager.get_post_impressions_organic(args.get('post_id')),
-                "get_post_engaged_users": lambda args: self.manager.get_post_engaged_users(args.get('post_id')),
-                "get_post_clicks": lambda args: self.manager.get_post_clicks(args.get('post_id')),
-                
-                # Reaction operations
-                "get_post_reactions_like_total": lambda args: self.manager.get_post_reactions_like_total(args.get('post_id')),
-                "get_post_reactions_love_total": lambda args: self.manager.get_post_reactions_love_total(args.get('post_id')),
-                "get_post_reactions_wow_total": lambda args: self.manager.get_post_reactions_wow_total(args.get('post_id')),
-                "get_post_reactions_haha_total": lambda args: self.manager.get_post_reactions_haha_total(args.get('post_id')),
-                "get_post_reactions_sorry_total": lambda args: self.manager.get_post_reactions_sorry_total(args.get('post_id')),
-                "get_post_reactions_anger_total": lambda args: self.manager.get_post_reactions_anger_total(args.get('post_id')),
-                
-                # Messaging
-                "send_dm_to_user": lambda args: self.manager.send_dm_to_user(
-                    args.get('user_id'), args.get('message')
-                ),
-            }
-            
-            if tool_name not in tool_mapping:
-                raise ValueError(f"Unknown tool: {tool_name}")
+            if tool_name not in self.tool_mapping:
+                raise UnknownTool(f"Unknown tool: {tool_name}")
             
             # Execute the tool
-            result = tool_mapping[tool_name](arguments)
+            result = self.tool_mapping[tool_name](arguments)
             return result
         
         except Exception as e:
@@ -94,235 +183,48 @@ class FacebookMCPWrapper:
     
     def list_tools(self):
         """List all available tools with their descriptions and parameters"""
-        return [
-            # Post operations
-            {
-                "name": "post_to_facebook",
-                "description": "Create a new Facebook Page post with a text message",
-                "parameters": {
-                    "message": {"type": "string", "required": True, "description": "The message to post"}
-                }
-            },
-            {
-                "name": "post_image_to_facebook",
-                "description": "Post an image with a caption to the Facebook page",
-                "parameters": {
-                    "image_url": {"type": "string", "required": True, "description": "URL of the image to post"},
-                    "caption": {"type": "string", "required": False, "description": "Caption for the image"}
-                }
-            },
-            {
-                "name": "schedule_post",
-                "description": "Schedule a new post for future publishing",
-                "parameters": {
-                    "message": {"type": "string", "required": True, "description": "The message to schedule"},
-                    "publish_time": {"type": "integer", "required": True, "description": "Unix timestamp for when to publish"}
-                }
-            },
-            {
-                "name": "update_post",
-                "description": "Update an existing post's message",
-                "parameters": {
-                    "post_id": {"type": "string", "required": True, "description": "ID of the post to update"},
-                    "new_message": {"type": "string", "required": True, "description": "New message content"}
-                }
-            },
-            {
-                "name": "delete_post",
-                "description": "Delete a specific post from the Facebook Page",
-                "parameters": {
-                    "post_id": {"type": "string", "required": True, "description": "ID of the post to delete"}
-                }
-            },
-            
-            # Comment operations
-            {
-                "name": "reply_to_comment",
-                "description": "Reply to a specific comment on a Facebook post",
-                "parameters": {
-                    "post_id": {"type": "string", "required": True, "description": "ID of the post"},
-                    "comment_id": {"type": "string", "required": True, "description": "ID of the comment to reply to"},
-                    "message": {"type": "string", "required": True, "description": "Reply message"}
-                }
-            },
-            {
-                "name": "delete_comment",
-                "description": "Delete a specific comment from the Page",
-                "parameters": {
-                    "comment_id": {"type": "string", "required": True, "description": "ID of the comment to delete"}
-                }
-            },
-            {
-                "name": "delete_comment_from_post",
-                "description": "Delete a comment from a specific post",
-                "parameters": {
-                    "post_id": {"type": "string", "required": True, "description": "ID of the post"},
-                    "comment_id": {"type": "string", "required": True, "description": "ID of the comment to delete"}
-                }
-            },
-            {
-                "name": "filter_negative_comments",
-                "description": "Filter comments for basic negative sentiment",
-                "parameters": {
-                    "comments": {"type": "object", "required": True, "description": "Comments object to filter"}
-                }
-            },
-            
-            # Get operations
-            {
-                "name": "get_page_posts",
-                "description": "Fetch the most recent posts on the Page",
-                "parameters": {}
-            },
-            {
-                "name": "get_post_comments",
-                "description": "Retrieve all comments for a given post",
-                "parameters": {
-                    "post_id": {"type": "string", "required": True, "description": "ID of the post"}
-                }
-            },
-            {
-                "name": "get_number_of_comments",
-                "description": "Count the number of comments on a given post",
-                "parameters": {
-                    "post_id": {"type": "string", "required": True, "description": "ID of the post"}
-                }
-            },
-            {
-                "name": "get_number_of_likes",
-                "description": "Return the number of likes on a post",
-                "parameters": {
-                    "post_id": {"type": "string", "required": True, "description": "ID of the post"}
-                }
-            },
-            {
-                "name": "get_post_top_commenters",
-                "description": "Get the top commenters on a post",
-                "parameters": {
-                    "post_id": {"type": "string", "required": True, "description": "ID of the post"}
-                }
-            },
-            {
-                "name": "get_page_fan_count",
-                "description": "Get the Page's total fan/like count",
-                "parameters": {}
-            },
-            {
-                "name": "get_post_share_count",
-                "description": "Get the number of shares for a post",
-                "parameters": {
-                    "post_id": {"type": "string", "required": True, "description": "ID of the post"}
-                }
-            },
-            
-            # Insights operations
-            {
-                "name": "get_post_insights",
-                "description": "Fetch all insights metrics (impressions, reactions, clicks, etc)",
-                "parameters": {
-                    "post_id": {"type": "string", "required": True, "description": "ID of the post"}
-                }
-            },
-            {
-                "name": "get_post_impressions",
-                "description": "Fetch total impressions of a post",
-                "parameters": {
-                    "post_id": {"type": "string", "required": True, "description": "ID of the post"}
-                }
-            },
-            {
-                "name": "get_post_impressions_unique",
-                "description": "Fetch unique impressions of a post",
-                "parameters": {
-                    "post_id": {"type": "string", "required": True, "description": "ID of the post"}
-                }
-            },
-            {
-                "name": "get_post_impressions_paid",
-                "description": "Fetch paid impressions of a post",
-                "parameters": {
-                    "post_id": {"type": "string", "required": True, "description": "ID of the post"}
-                }
-            },
-            {
-                "name": "get_post_impressions_organic",
-                "description": "Fetch organic impressions of a post",
-                "parameters": {
-                    "post_id": {"type": "string", "required": True, "description": "ID of the post"}
-                }
-            },
-            {
-                "name": "get_post_engaged_users",
-                "description": "Fetch number of engaged users",
-                "parameters": {
-                    "post_id": {"type": "string", "required": True, "description": "ID of the post"}
-                }
-            },
-            {
-                "name": "get_post_clicks",
-                "description": "Fetch number of post clicks",
-                "parameters": {
-                    "post_id": {"type": "string", "required": True, "description": "ID of the post"}
-                }
-            },
-            
-            # Reaction operations
-            {
-                "name": "get_post_reactions_like_total",
-                "description": "Fetch number of 'Like' reactions",
-                "parameters": {
-                    "post_id": {"type": "string", "required": True, "description": "ID of the post"}
-                }
-            },
-            {
-                "name": "get_post_reactions_love_total",
-                "description": "Fetch number of 'Love' reactions",
-                "parameters": {
-                    "post_id": {"type": "string", "required": True, "description": "ID of the post"}
-                }
-            },
-            {
-                "name": "get_post_reactions_wow_total",
-                "description": "Fetch number of 'Wow' reactions",
-                "parameters": {
-                    "post_id": {"type": "string", "required": True, "description": "ID of the post"}
-                }
-            },
-            {
-                "name": "get_post_reactions_haha_total",
-                "description": "Fetch number of 'Haha' reactions",
-                "parameters": {
-                    "post_id": {"type": "string", "required": True, "description": "ID of the post"}
-                }
-            },
-            {
-                "name": "get_post_reactions_sorry_total",
-                "description": "Fetch number of 'Sorry' reactions",
-                "parameters": {
-                    "post_id": {"type": "string", "required": True, "description": "ID of the post"}
-                }
-            },
-            {
-                "name": "get_post_reactions_anger_total",
-                "description": "Fetch number of 'Anger' reactions",
-                "parameters": {
-                    "post_id": {"type": "string", "required": True, "description": "ID of the post"}
-                }
-            },
-            
-            # Messaging
-            {
-                "name": "send_dm_to_user",
-                "description": "Send a direct message to a user",
-                "parameters": {
-                    "user_id": {"type": "string", "required": True, "description": "ID of the user to message"},
-                    "message": {"type": "string", "required": True, "description": "Message to send"}
-                }
-            }
-        ]
+        # Precomputed in tools_manifest.json and read on first use, so startup does not build it
+        if self._tools is None:
+            with open(TOOLS_MANIFEST) as f:
+                self._tools = json.load(f)
+        return self._tools
 
 # Initialize the wrapper
 mcp_wrapper = FacebookMCPWrapper()
+admission = AdmissionController(MAX_CONCURRENT_CALLS, MAX_QUEUED_CALLS, MAX_CALLS_PER_CLIENT, QUEUE_TIMEOUT)
+
+def client_id():
+    """Fairness key: the X-Client-Id header, or the caller's address (forwarded by WRAPPER_TRUSTED_PROXIES proxies)"""
+    return request.headers.get('X-Client-Id') or request.remote_addr or 'unknown'
+
+def request_deadline():
+    """Monotonic time by which a call must have started, from the X-Deadline-Ms header (a budget in milliseconds)
+
+    The header can only shorten the wait; it is capped at QUEUE_TIMEOUT.
+    """
+    budget = request.headers.get('X-Deadline-Ms')
+    if not budget:
+        return time.monotonic() + QUEUE_TIMEOUT
+    budget = float(budget) / 1000
+    if not math.isfinite(budget):
+        raise ValueError("X-Deadline-Ms must be finite")
+    return time.monotonic() + min(budget, QUEUE_TIMEOUT)
+
+def rejected(error):
+    """429/503 response with Retry-After for a call refused by admission control"""
+    response = jsonify({
+        'success': False,
+        'error': str(error),
+        'retry_after': error.retry_after
+    })
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, error.status
+
+def invalid_deadline():
+    return jsonify({
+        'success': False,
+        'error': 'X-Deadline-Ms must be a finite number of milliseconds'
+    }), 400
 
 def sync_route(f):
     """Decorator to handle synchronous routes in Flask"""
@@ -345,7 +247,8 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'service': 'facebook-mcp-wrapper',
-        'version': '1.0.0'
+        'version': '1.0.0',
+        'admission': admission.stats()
     })
 
 @app.route('/tools', methods=['GET'])
@@ -378,13 +281,18 @@ def execute_tool(tool_name):
         }), 400
     
     arguments = data.get('arguments', {})
+    try:
+        deadline = request_deadline()
+    except ValueError:
+        return invalid_deadline()
     
     # Log the request
     logger.info(f"Executing tool: {tool_name} with arguments: {arguments}")
     
     try:
-        # Execute the tool
-        result = mcp_wrapper.call_tool(tool_name, arguments)
+        # Execute the tool once admission control grants a slot
+        with admission.admit(tool_priority(tool_name), client_id(), deadline - time.monotonic()):
+            result = mcp_wrapper.call_tool(tool_name, arguments)
         
         return jsonify({
             'success': True,
@@ -392,13 +300,30 @@ def execute_tool(tool_name):
             'data': result
         })
     
-    except ValueError as e:
-        # Tool not found
+    except Rejected as e:
+        logger.warning(f"Rejected tool {tool_name}: {str(e)}")
+        return rejected(e)
+    
+    except PermissionError as e:
+        # Upload path outside FACEBOOK_UPLOAD_DIR, or path uploads disabled
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 403
+    
+    except UnknownTool as e:
         return jsonify({
             'success': False,
             'error': str(e)
         }), 404
     
+    except ValueError as e:
+        # Invalid arguments, e.g. an unknown output mode or page
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
     except Exception as e:
         # Other errors
         logger.error(f"Error executing tool {tool_name}: {str(e)}")
@@ -419,18 +344,36 @@ def execute_batch():
             'error': 'Request must contain "tools" array'
         }), 400
     
+    try:
+        deadline = request_deadline()
+    except ValueError:
+        return invalid_deadline()
+    client = client_id()
+    
+    # Each call is admitted on its own, so a long batch cannot hold a slot throughout
     results = []
+    retry_after = None
     for tool_request in data['tools']:
         tool_name = tool_request.get('name')
         arguments = tool_request.get('arguments', {})
         
         try:
-            result = mcp_wrapper.call_tool(tool_name, arguments)
+            with admission.admit(tool_priority(tool_name), client, deadline - time.monotonic()):
+                result = mcp_wrapper.call_tool(tool_name, arguments)
             results.append({
                 'tool': tool_name,
                 'success': True,
                 'data': result
             })
+        except Rejected as e:
+            retry_after = max(retry_after or 0, e.retry_after)
+            results.append({
+                'tool': tool_name,
+                'success': False,
+                'error': str(e),
+                'status': e.status,
+                'retry_after': e.retry_after
+            })
         except Exception as e:
             results.append({
                 'tool': tool_name,
@@ -438,10 +381,13 @@ def execute_batch():
                 'error': str(e)
             })
     
-    return jsonify({
+    response = jsonify({
         'success': True,
         'results': results
     })
+    if retry_after is not None:
+        response.headers['Retry-After'] = str(retry_after)
+    return response
 
 @app.errorhandler(404)
 def not_found(error):
@@ -1,111 +1,170 @@
-from typing import Any
-from facebook_api import FacebookAPI
+import math
+import threading
+from typing import TYPE_CHECKING, Any
+from projection import shape, with_fields
 
+if TYPE_CHECKING:
+    from facebook_api import FacebookAPI
+    from tenancy import TenantRegistry
 
-class Manager:
-    def __init__(self):
-        self.api = FacebookAPI()
-
-
-    def post_to_facebook(self, message: str) -> dict[str, Any]:
-        return self.api.post_message(message)
-
-    def reply_to_comment(self, post_id: str, comment_id: str, message: str) -> dict[str, Any]:
-        return self.api.reply_to_comment(comment_id, message)
-
-    def get_page_posts(self) -> dict[str, Any]:
-        return self.api.get_posts()
-
-    def get_post_comments(self, post_id: str) -> dict[str, Any]:
-        return self.api.get_comments(post_id)
-
-    def delete_post(self, post_id: str) -> dict[str, Any]:
-        return self.api.delete_post(post_id)
 
-    def delete_comment(self, comment_id: str) -> dict[str, Any]:
-        return self.api.delete_comment(comment_id)
-
-    def delete_comment_from_post(self, post_id: str, comment_id: str) -> dict[str, Any]:
-        return self.api.delete_comment(comment_id)
+class Manager:
+    def __init__(self, tenants: "TenantRegistry" = None):
+        self._tenants = tenants
+        self._lock = threading.Lock()
+
+    # Pages, clients and the HTTP stack (requests) are loaded on the first tool call, not at import
+    @property
+    def tenants(self) -> "TenantRegistry":
+        if self._tenants is None:
+            with self._lock:
+                if self._tenants is None:
+                    from tenancy import TenantRegistry
+                    self._tenants = TenantRegistry.from_env()
+        return self._tenants
+
+    # API client for the given page ID or alias; the default page when omitted
+    def _api(self, page_id: str = None) -> "FacebookAPI":
+        return self.tenants.get(page_id).api
+
+    # changed_since as a number, checked before any Graph call; HTTP callers can send any JSON value
+    @staticmethod
+    def _cursor(changed_since: Any) -> float | None:
+        if changed_since is None:
+            return None
+        if isinstance(changed_since, (int, float)) and not isinstance(changed_since, bool) and math.isfinite(changed_since):
+            return float(changed_since)
+        raise ValueError(f"changed_since must be a cursor (Unix time) from a previous call, got {changed_since!r}")
+
+    # Insight read with the projection pushed into Graph's fields parameter
+    def _insights(self, post_id: str, metric: str, fields: list[str], output: str, page_id: str) -> dict[str, Any]:
+        api_fields = fields
+        if output != "raw":
+            api_fields = with_fields(fields, ["name", "values"]) or ["name", "values"]
+        return shape(self._api(page_id).get_insights(post_id, metric, fields=api_fields), fields, output)
+
+    def list_pages(self) -> list[str]:
+        return self.tenants.page_ids()
+
+    def post_to_facebook(self, message: str, page_id: str = None) -> dict[str, Any]:
+        return self._api(page_id).post_message(message)
+
+    def reply_to_comment(self, post_id: str, comment_id: str, message: str, page_id: str = None) -> dict[str, Any]:
+        return self._api(page_id).reply_to_comment(comment_id, message)
+
+    def get_page_posts(self, changed_since: float = None, fields: list[str] = None, output: str = "raw",
+                       page_id: str = None) -> dict[str, Any]:
+        return shape(self._api(page_id).get_posts(self._cursor(changed_since), fields), fields, output)
+
+    def get_post_comments(self, post_id: str, changed_since: float = None, fields: list[str] = None,
+                          output: str = "raw", page_id: str = None) -> dict[str, Any]:
+        return shape(self._api(page_id).get_comments(post_id, self._cursor(changed_since), fields), fields, output)
+
+    def delete_post(self, post_id: str, page_id: str = None) -> dict[str, Any]:
+        return self._api(page_id).delete_post(post_id)
+
+    def delete_comment(self, comment_id: str, page_id: str = None) -> dict[str, Any]:
+        return self._api(page_id).delete_comment(comment_id)
+
+    def delete_comment_from_post(self, post_id: str, comment_id: str, page_id: str = None) -> dict[str, Any]:
+        return self._api(page_id).delete_comment(comment_id)
 
     def filter_negative_comments(self, comments: dict[str, Any]) -> list[dict[str, Any]]:
         keywords = ["bad", "terrible", "awful", "hate", "dislike", "problem", "issue"]
         return [c for c in comments.get("data", []) if any(k in c.get("message", "").lower() for k in keywords)]
 
-    def get_number_of_comments(self, post_id: str) -> int:
-        return len(self.api.get_comments(post_id).get("data", []))
+    def get_number_of_comments(self, post_id: str, page_id: str = None) -> int:
+        return len(self._api(page_id).get_comments(post_id).get("data", []))
 
-    def get_number_of_likes(self, post_id: str) -> int:
-        return self.api._request("GET", post_id, {"fields": "likes.summary(true)"}).get("likes", {}).get("summary", {}).get("total_count", 0)
+    def get_number_of_likes(self, post_id: str, page_id: str = None) -> int:
+        return self._api(page_id)._request("GET", post_id, {"fields": "likes.summary(true)"}).get("likes", {}).get("summary", {}).get("total_count", 0)
 
-    def get_post_insights(self, post_id: str) -> dict[str, Any]:
+    def get_post_insights(self, post_id: str, fields: list[str] = None, output: str = "raw",
+                          page_id: str = None) -> dict[str, Any]:
         metrics = [
             "post_impressions", "post_impressions_unique", "post_impressions_paid",
             "post_impressions_organic", "post_engaged_users", "post_clicks",
             "post_reactions_like_total", "post_reactions_love_total", "post_reactions_wow_total",
             "post_reactions_haha_total", "post_reactions_sorry_total", "post_reactions_anger_total",
         ]
-        return self.api.get_bulk_insights(post_id, metrics)
+        return self._insights(post_id, ",".join(metrics), fields, output, page_id)
     
-    def get_post_impressions(self, post_id: str) -> dict[str, Any]:
-        return self.api.get_insights(post_id, "post_impressions")
+    def get_post_impressions(self, post_id: str, fields: list[str] = None, output: str = "raw", page_id: str = None) -> dict[str, Any]:
+        return self._insights(post_id, "post_impressions", fields, output, page_id)
 
-    def get_post_impressions_unique(self, post_id: str) -> dict[str, Any]:
-        return self.api.get_insights(post_id, "post_impressions_unique")
+    def get_post_impressions_unique(self, post_id: str, fields: list[str] = None, output: str = "raw", page_id: str = None) -> dict[str, Any]:
+        return self._insights(post_id, "post_impressions_unique", fields, output, page_id)
 
-    def get_post_impressions_paid(self, post_id: str) -> dict[str, Any]:
-        return self.api.get_insights(post_id, "post_impressions_paid")
+    def get_post_impressions_paid(self, post_id: str, fields: list[str] = None, output: str = "raw", page_id: str = None) -> dict[str, Any]:
+        return self._insights(post_id, "post_impressions_paid", fields, output, page_id)
 
-    def get_post_impressions_organic(self, post_id: str) -> dict[str, Any]:
-        return self.api.get_insights(post_id, "post_impressions_organic")
+    def get_post_impressions_organic(self, post_id: str, fields: list[str] = None, output: str = "raw", page_id: str = None) -> dict[str, Any]:
+        return self._insights(post_id, "post_impressions_organic", fields, output, page_id)
 
-    def get_post_engaged_users(self, post_id: str) -> dict[str, Any]:
-        return self.api.get_insights(post_id, "post_engaged_users")
+    def get_post_engaged_users(self, post_id: str, fields: list[str] = None, output: str = "raw", page_id: str = None) -> dict[str, Any]:
+        return self._insights(post_id, "post_engaged_users", fields, output, page_id)
 
-    def get_post_clicks(self, post_id: str) -> dict[str, Any]:
-        return self.api.get_insights(post_id, "post_clicks")
+    def get_post_clicks(self, post_id: str, fields: list[str] = None, output: str = "raw", page_id: str = None) -> dict[str, Any]:
+        return self._insights(post_id, "post_clicks", fields, output, page_id)
 
-    def get_post_reactions_like_total(self, post_id: str) -> dict[str, Any]:
-        return self.api.get_insights(post_id, "post_reactions_like_total")
+    def get_post_reactions_like_total(self, post_id: str, fields: list[str] = None, output: str = "raw", page_id: str = None) -> dict[str, Any]:
+        return self._insights(post_id, "post_reactions_like_total", fields, output, page_id)
 
-    def get_post_reactions_love_total(self, post_id: str) -> dict[str, Any]:
-        return self.api.get_insights(post_id, "post_reactions_love_total")
+    def get_post_reactions_love_total(self, post_id: str, fields: list[str] = None, output: str = "raw", page_id: str = None) -> dict[str, Any]:
+        return self._insights(post_id, "post_reactions_love_total", fields, output, page_id)
 
-    def get_post_reactions_wow_total(self, post_id: str) -> dict[str, Any]:
-        return self.api.get_insights(post_id, "post_reactions_wow_total")
+    def get_post_reactions_wow_total(self, post_id: str, fields: list[str] = None, output: str = "raw", page_id: str = None) -> dict[str, Any]:
+        return self._insights(post_id, "post_reactions_wow_total", fields, output, page_id)
 
-    def get_post_reactions_haha_total(self, post_id: str) -> dict[str, Any]:
-        return self.api.get_insights(post_id, "post_reactions_haha_total")
+    def get_post_reactions_haha_total(self, post_id: str, fields: list[str] = None, output: str = "raw", page_id: str = None) -> dict[str, Any]:
+        return self._insights(post_id, "post_reactions_haha_total", fields, output, page_id)
 
-    def get_post_reactions_sorry_total(self, post_id: str) -> dict[str, Any]:
-        return self.api.get_insights(post_id, "post_reactions_sorry_total")
+    def get_post_reactions_sorry_total(self, post_id: str, fields: list[str] = None, output: str = "raw", page_id: str = None) -> dict[str, Any]:
+        return self._insights(post_id, "post_reactions_sorry_total", fields, output, page_id)
 
-    def get_post_reactions_anger_total(self, post_id: str) -> dict[str, Any]:
-        return self.api.get_insights(post_id, "post_reactions_anger_total")
+    def get_post_reactions_anger_total(self, post_id: str, fields: list[str] = None, output: str = "raw", page_id: str = None) -> dict[str, Any]:
+        return self._insights(post_id, "post_reactions_anger_total", fields, output, page_id)
 
-    def get_post_top_commenters(self, post_id: str) -> list[dict[str, Any]]:
-        comments = self.get_post_comments(post_id).get("data", [])
+    def get_post_top_commenters(self, post_id: str, output: str = "raw",
+                                page_id: str = None) -> list[dict[str, Any]] | dict[str, list[Any]]:
+        comments = self._api(page_id).get_comments(post_id, fields=["id", "from.id"]).get("data", [])
         counter = {}
         for comment in comments:
             user_id = comment.get("from", {}).get("id")
             if user_id:
                 counter[user_id] = counter.get(user_id, 0) + 1
-        return sorted([{"user_id": k, "count": v} for k, v in counter.items()], key=lambda x: x["count"], reverse=True)
+        ranked = sorted([{"user_id": k, "count": v} for k, v in counter.items()], key=lambda x: x["count"], reverse=True)
+        return shape(ranked, output=output)
+
+    def post_image_to_facebook(self, image_url: str, caption: str, page_id: str = None) -> dict[str, Any]:
+        return self._api(page_id).post_image_to_facebook(image_url, caption)
+
+    def post_local_image_to_facebook(self, image_path: str, caption: str, page_id: str = None) -> dict[str, Any]:
+        return self._api(page_id).upload_photo(image_path, caption)
 
-    def post_image_to_facebook(self, image_url: str, caption: str) -> dict[str, Any]:
-        return self.api.post_image_to_facebook(image_url, caption)
+    def post_multi_photo_to_facebook(self, image_paths: list[str], message: str, page_id: str = None) -> dict[str, Any]:
+        return self._api(page_id).post_multi_photo(image_paths, message)
 
-    def send_dm_to_user(self, user_id: str, message: str) -> dict[str, Any]:
-        return self.api.send_dm_to_user(user_id, message)
+    def post_video_to_facebook(self, video_path: str, description: str, title: str, page_id: str = None) -> dict[str, Any]:
+        return self._api(page_id).upload_video(video_path, description, title)
+
+    def send_dm_to_user(self, user_id: str, message: str, page_id: str = None) -> dict[str, Any]:
+        return self._api(page_id).send_dm_to_user(user_id, message)
     
-    def update_post(self, post_id: str, new_message: str) -> dict[str, Any]:
-        return self.api.update_post(post_id, new_message)
+    def update_post(self, post_id: str, new_message: str, page_id: str = None) -> dict[str, Any]:
+        return self._api(page_id).update_post(post_id, new_message)
+
+    def schedule_post(self, message: str, publish_time: int, page_id: str = None) -> dict[str, Any]:
+        return self._api(page_id).schedule_post(message, publish_time)
+
+    def bulk_post_to_facebook(self, posts: list[dict[str, Any]], page_id: str = None) -> dict[str, Any]:
+        return self.tenants.get(page_id).bulk.publish(posts, scheduled=False)
 
-    def schedule_post(self, message: str, publish_time: int) -> dict[str, Any]:
-        return self.api.schedule_post(message, publish_time)
+    def bulk_schedule_posts(self, posts: list[dict[str, Any]], page_id: str = None) -> dict[str, Any]:
+        return self.tenants.get(page_id).bulk.publish(posts, scheduled=True)
 
-    def get_page_fan_count(self) -> int:
-        return self.api.get_page_fan_count()
+    def get_page_fan_count(self, page_id: str = None) -> int:
+        return self._api(page_id).get_page_fan_count()
 
-    def get_post_share_count(self, post_id: str) -> int:
-        return self.api.get_post_share_count(post_id)
+    def get_post_share_count(self, post_id: str, page_id: str = None) -> int:
+        return self._api(page_id).get_post_share_count(post_id)
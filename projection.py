@@ -0,0 +1,96 @@
+from typing import Any
+
+# raw: Graph JSON as returned; compact: flattened records without paging and scalar insight
+# values; columnar: compact records transposed into one array per field
+OUTPUT_MODES = ("raw", "compact", "columnar")
+
+
+def graph_fields(fields: list[str]) -> str:
+    """Translate dotted paths such as ["id", "from.name"] into Graph syntax: "id,from{name}"."""
+    tree: dict[str, Any] = {}
+    for field in fields:
+        node = tree
+        for part in field.split("."):
+            node = node.setdefault(part, {})
+
+    def render(node: dict[str, Any]) -> str:
+        return ",".join(f"{name}{{{render(child)}}}" if child else name for name, child in node.items())
+
+    return render(tree)
+
+
+def with_fields(fields: list[str] | None, required: list[str]) -> list[str] | None:
+    """Add fields the caller needs internally to a requested projection."""
+    if not fields:
+        return None
+    return list(dict.fromkeys([*required, *fields]))
+
+
+def project(record: dict[str, Any], fields: list[str]) -> dict[str, Any]:
+    """Keep only the given dotted paths of a record, preserving nesting."""
+    result: dict[str, Any] = {}
+    for field in fields:
+        value: Any = record
+        for part in field.split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+        if value is None:
+            continue
+        target = result
+        *parents, leaf = field.split(".")
+        for part in parents:
+            target = target.setdefault(part, {})
+        target[leaf] = value
+    return result
+
+
+def flatten(record: dict[str, Any], prefix: str = "") -> dict[str, Any]:
+    """Turn nested objects into dotted keys, e.g. {"from": {"id": 1}} -> {"from.id": 1}."""
+    flat = {}
+    for key, value in record.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def columns(records: list[dict[str, Any]]) -> dict[str, list[Any]]:
+    names = list(dict.fromkeys(name for record in records for name in record))
+    return {name: [record.get(name) for record in records] for name in names}
+
+
+def is_insight(record: dict[str, Any]) -> bool:
+    return "name" in record and isinstance(record.get("values"), list)
+
+
+def insight_value(record: dict[str, Any]) -> Any:
+    # Insights carry one value per period end; the latest one is what agents want
+    values = record["values"]
+    return values[-1].get("value") if values else None
+
+
+def shape(data: Any, fields: list[str] = None, output: str = "raw") -> Any:
+    """Apply a field projection and output mode to a tool result."""
+    if output not in OUTPUT_MODES:
+        raise ValueError(f"Unknown output mode: {output}; expected one of {', '.join(OUTPUT_MODES)}")
+    if isinstance(data, list):
+        records = [project(r, fields) if fields else r for r in data]
+        return columns([flatten(r) for r in records]) if output == "columnar" else records
+    if not isinstance(data, dict) or "error" in data or not isinstance(data.get("data"), list):
+        return data
+
+    records = [project(r, fields) if fields else r for r in data["data"]]
+    if output == "raw":
+        return {**data, "data": records}
+
+    result = {k: v for k, v in data.items() if k not in ("data", "paging")}
+    if records and all(is_insight(r) for r in data["data"]):
+        result["data"] = {r["name"]: insight_value(r) for r in data["data"]}
+        return result
+    records = [flatten(r) for r in records]
+    if output == "columnar":
+        result["count"] = len(records)
+        result["data"] = columns(records)
+    else:
+        result["data"] = records
+    return result
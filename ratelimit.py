@@ -0,0 +1,49 @@
+import threading
+import time
+from backends import StateBackend
+
+
+class RateLimiter:
+    """Token bucket that allows `rate` calls per second with bursts of up to `burst` calls."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Take one token, sleeping until one is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class SharedRateLimiter:
+    """Fixed-window limiter whose counters live in a shared backend, so every worker draws from
+    one budget of `rate` calls per second (with up to `burst` calls in a window).
+    """
+
+    def __init__(self, state: StateBackend, rate: float, burst: int):
+        self.state = state
+        self.rate = rate
+        # Window long enough to hold `burst` calls at the sustained rate, at least one second
+        self.window = max(1.0, burst / rate)
+        self.limit = max(1, int(self.rate * self.window))
+
+    def acquire(self) -> None:
+        """Take one call from the current window, sleeping until the next window if it is spent."""
+        while True:
+            now = time.time()
+            window = int(now // self.window)
+            if self.state.incr(f"rate:{window}", ttl=self.window * 2) <= self.limit:
+                return
+            time.sleep((window + 1) * self.window - now)
@@ -6,60 +6,71 @@ mcp = FastMCP("FacebookMCP")
 manager = Manager()
 
 @mcp.tool()
-def post_to_facebook(message: str) -> dict[str, Any]:
+def list_pages() -> list[str]:
+    """List the IDs of all Facebook Pages this server can manage.
+    Input: None
+    Output: list of page IDs; pass one as page_id to any other tool
+    """
+    return manager.list_pages()
+
+@mcp.tool()
+def post_to_facebook(message: str, page_id: str | None = None) -> dict[str, Any]:
     """Create a new Facebook Page post with a text message.
-    Input: message (str)
+    Input: message (str), page_id (optional str)
     Output: dict with post ID and creation status
     """
-    return manager.post_to_facebook(message)
+    return manager.post_to_facebook(message, page_id)
 
 @mcp.tool()
-def reply_to_comment(post_id: str, comment_id: str, message: str) -> dict[str, Any]:
+def reply_to_comment(post_id: str, comment_id: str, message: str, page_id: str | None = None) -> dict[str, Any]:
     """Reply to a specific comment on a Facebook post.
-    Input: post_id (str), comment_id (str), message (str)
+    Input: post_id (str), comment_id (str), message (str), page_id (optional str)
     Output: dict with reply creation status
     """
-    return manager.reply_to_comment(post_id, comment_id, message)
+    return manager.reply_to_comment(post_id, comment_id, message, page_id)
 
 @mcp.tool()
-def get_page_posts() -> dict[str, Any]:
+def get_page_posts(changed_since: float | None = None, fields: list[str] | None = None, output: str = "raw",
+                   page_id: str | None = None) -> dict[str, Any]:
     """Fetch the most recent posts on the Page.
-    Input: None
-    Output: dict with list of post objects and metadata
+    Input: changed_since (optional cursor from a previous call), fields (optional list of str), output (raw/compact/columnar), page_id (optional str)
+    Output: dict with list of post objects and metadata; with changed_since, only new or
+    edited posts and a new cursor
     """
-    return manager.get_page_posts()
+    return manager.get_page_posts(changed_since, fields, output, page_id)
 
 @mcp.tool()
-def get_post_comments(post_id: str) -> dict[str, Any]:
+def get_post_comments(post_id: str, changed_since: float | None = None, fields: list[str] | None = None,
+                      output: str = "raw", page_id: str | None = None) -> dict[str, Any]:
     """Retrieve all comments for a given post.
-    Input: post_id (str)
-    Output: dict with comment objects
+    Input: post_id (str), changed_since (optional cursor from a previous call), fields (optional list of str), output (raw/compact/columnar), page_id (optional str)
+    Output: dict with comment objects; with changed_since, only new or edited comments and a new cursor
     """
-    return manager.get_post_comments(post_id)
+    return manager.get_post_comments(post_id, changed_since, fields, output, page_id)
 
 @mcp.tool()
-def delete_post(post_id: str) -> dict[str, Any]:
+def delete_post(post_id: str, page_id: str | None = None) -> dict[str, Any]:
     """Delete a specific post from the Facebook Page.
-    Input: post_id (str)
+    Input: post_id (str), page_id (optional str)
     Output: dict with deletion result
     """
-    return manager.delete_post(post_id)
+    return manager.delete_post(post_id, page_id)
 
 @mcp.tool()
-def delete_comment(comment_id: str) -> dict[str, Any]:
+def delete_comment(comment_id: str, page_id: str | None = None) -> dict[str, Any]:
     """Delete a specific comment from the Page.
-    Input: comment_id (str)
+    Input: comment_id (str), page_id (optional str)
     Output: dict with deletion result
     """
-    return manager.delete_comment(comment_id)
+    return manager.delete_comment(comment_id, page_id)
 
 @mcp.tool()
-def delete_comment_from_post(post_id: str, comment_id: str) -> dict[str, Any]:
+def delete_comment_from_post(post_id: str, comment_id: str, page_id: str | None = None) -> dict[str, Any]:
     """Alias to delete a comment on a post.
-    Input: post_id (str), comment_id (str)
+    Input: post_id (str), comment_id (str), page_id (optional str)
     Output: dict with deletion result
     """
-    return manager.delete_comment_from_post(post_id, comment_id)
+    return manager.delete_comment_from_post(post_id, comment_id, page_id)
 
 @mcp.tool()
 def filter_negative_comments(comments: dict[str, Any]) -> list[dict[str, Any]]:
@@ -70,177 +81,231 @@ def filter_negative_comments(comments: dict[str, Any]) -> list[dict[str, Any]]:
     return manager.filter_negative_comments(comments)
 
 @mcp.tool()
-def get_number_of_comments(post_id: str) -> int:
+def get_number_of_comments(post_id: str, page_id: str | None = None) -> int:
     """Count the number of comments on a given post.
-    Input: post_id (str)
+    Input: post_id (str), page_id (optional str)
     Output: integer count of comments
     """
-    return manager.get_number_of_comments(post_id)
+    return manager.get_number_of_comments(post_id, page_id)
 
 @mcp.tool()
-def get_number_of_likes(post_id: str) -> int:
+def get_number_of_likes(post_id: str, page_id: str | None = None) -> int:
     """Return the number of likes on a post.
-    Input: post_id (str)
+    Input: post_id (str), page_id (optional str)
     Output: integer count of likes
     """
-    return manager.get_number_of_likes(post_id)
+    return manager.get_number_of_likes(post_id, page_id)
 
 @mcp.tool()
-def get_post_insights(post_id: str) -> dict[str, Any]:
+def get_post_insights(post_id: str, fields: list[str] | None = None, output: str = "raw",
+                      page_id: str | None = None) -> dict[str, Any]:
     """Fetch all insights metrics (impressions, reactions, clicks, etc).
-    Input: post_id (str)
+    Input: post_id (str), fields (optional list of str), output (raw/compact/columnar), page_id (optional str)
     Output: dict with multiple metrics and their values
     """
-    return manager.get_post_insights(post_id)
+    return manager.get_post_insights(post_id, fields, output, page_id)
 
 @mcp.tool()
-def get_post_impressions(post_id: str) -> dict[str, Any]:
+def get_post_impressions(post_id: str, fields: list[str] | None = None, output: str = "raw",
+                         page_id: str | None = None) -> dict[str, Any]:
     """Fetch total impressions of a post.
-    Input: post_id (str)
+    Input: post_id (str), fields (optional list of str), output (raw/compact/columnar), page_id (optional str)
     Output: dict with total impression count
     """
-    return manager.get_post_impressions(post_id)
+    return manager.get_post_impressions(post_id, fields, output, page_id)
 
 @mcp.tool()
-def get_post_impressions_unique(post_id: str) -> dict[str, Any]:
+def get_post_impressions_unique(post_id: str, fields: list[str] | None = None, output: str = "raw",
+                                page_id: str | None = None) -> dict[str, Any]:
     """Fetch unique impressions of a post.
-    Input: post_id (str)
+    Input: post_id (str), fields (optional list of str), output (raw/compact/columnar), page_id (optional str)
     Output: dict with unique impression count
     """
-    return manager.get_post_impressions_unique(post_id)
+    return manager.get_post_impressions_unique(post_id, fields, output, page_id)
 
 @mcp.tool()
-def get_post_impressions_paid(post_id: str) -> dict[str, Any]:
+def get_post_impressions_paid(post_id: str, fields: list[str] | None = None, output: str = "raw",
+                              page_id: str | None = None) -> dict[str, Any]:
     """Fetch paid impressions of a post.
-    Input: post_id (str)
+    Input: post_id (str), fields (optional list of str), output (raw/compact/columnar), page_id (optional str)
     Output: dict with paid impression count
     """
-    return manager.get_post_impressions_paid(post_id)
+    return manager.get_post_impressions_paid(post_id, fields, output, page_id)
 
 @mcp.tool()
-def get_post_impressions_organic(post_id: str) -> dict[str, Any]:
+def get_post_impressions_organic(post_id: str, fields: list[str] | None = None, output: str = "raw",
+                                 page_id: str | None = None) -> dict[str, Any]:
     """Fetch organic impressions of a post.
-    Input: post_id (str)
+    Input: post_id (str), fields (optional list of str), output (raw/compact/columnar), page_id (optional str)
     Output: dict with organic impression count
     """
-    return manager.get_post_impressions_organic(post_id)
+    return manager.get_post_impressions_organic(post_id, fields, output, page_id)
 
 @mcp.tool()
-def get_post_engaged_users(post_id: str) -> dict[str, Any]:
+def get_post_engaged_users(post_id: str, fields: list[str] | None = None, output: str = "raw",
+                           page_id: str | None = None) -> dict[str, Any]:
     """Fetch number of engaged users.
-    Input: post_id (str)
+    Input: post_id (str), fields (optional list of str), output (raw/compact/columnar), page_id (optional str)
     Output: dict with engagement count
     """
-    return manager.get_post_engaged_users(post_id)
+    return manager.get_post_engaged_users(post_id, fields, output, page_id)
 
 @mcp.tool()
-def get_post_clicks(post_id: str) -> dict[str, Any]:
+def get_post_clicks(post_id: str, fields: list[str] | None = None, output: str = "raw",
+                    page_id: str | None = None) -> dict[str, Any]:
     """Fetch number of post clicks.
-    Input: post_id (str)
+    Input: post_id (str), fields (optional list of str), output (raw/compact/columnar), page_id (optional str)
     Output: dict with click count
     """
-    return manager.get_post_clicks(post_id)
+    return manager.get_post_clicks(post_id, fields, output, page_id)
 
 @mcp.tool()
-def get_post_reactions_like_total(post_id: str) -> dict[str, Any]:
+def get_post_reactions_like_total(post_id: str, fields: list[str] | None = None, output: str = "raw",
+                                  page_id: str | None = None) -> dict[str, Any]:
     """Fetch number of 'Like' reactions.
-    Input: post_id (str)
+    Input: post_id (str), fields (optional list of str), output (raw/compact/columnar), page_id (optional str)
     Output: dict with like count
     """
-    return manager.get_post_reactions_like_total(post_id)
+    return manager.get_post_reactions_like_total(post_id, fields, output, page_id)
 
 @mcp.tool()
-def get_post_reactions_love_total(post_id: str) -> dict[str, Any]:
+def get_post_reactions_love_total(post_id: str, fields: list[str] | None = None, output: str = "raw",
+                                  page_id: str | None = None) -> dict[str, Any]:
     """Fetch number of 'Love' reactions.
-    Input: post_id (str)
+    Input: post_id (str), fields (optional list of str), output (raw/compact/columnar), page_id (optional str)
     Output: dict with love count
     """
-    return manager.get_post_reactions_love_total(post_id)
+    return manager.get_post_reactions_love_total(post_id, fields, output, page_id)
 
 @mcp.tool()
-def get_post_reactions_wow_total(post_id: str) -> dict[str, Any]:
+def get_post_reactions_wow_total(post_id: str, fields: list[str] | None = None, output: str = "raw",
+                                 page_id: str | None = None) -> dict[str, Any]:
     """Fetch number of 'Wow' reactions.
-    Input: post_id (str)
+    Input: post_id (str), fields (optional list of str), output (raw/compact/columnar), page_id (optional str)
     Output: dict with wow count
     """
-    return manager.get_post_reactions_wow_total(post_id)
+    return manager.get_post_reactions_wow_total(post_id, fields, output, page_id)
 
 @mcp.tool()
-def get_post_reactions_haha_total(post_id: str) -> dict[str, Any]:
+def get_post_reactions_haha_total(post_id: str, fields: list[str] | None = None, output: str = "raw",
+                                  page_id: str | None = None) -> dict[str, Any]:
     """Fetch number of 'Haha' reactions.
-    Input: post_id (str)
+    Input: post_id (str), fields (optional list of str), output (raw/compact/columnar), page_id (optional str)
     Output: dict with haha count
     """
-    return manager.get_post_reactions_haha_total(post_id)
+    return manager.get_post_reactions_haha_total(post_id, fields, output, page_id)
 
 @mcp.tool()
-def get_post_reactions_sorry_total(post_id: str) -> dict[str, Any]:
+def get_post_reactions_sorry_total(post_id: str, fields: list[str] | None = None, output: str = "raw",
+                                   page_id: str | None = None) -> dict[str, Any]:
     """Fetch number of 'Sorry' reactions.
-    Input: post_id (str)
+    Input: post_id (str), fields (optional list of str), output (raw/compact/columnar), page_id (optional str)
     Output: dict with sorry count
     """
-    return manager.get_post_reactions_sorry_total(post_id)
+    return manager.get_post_reactions_sorry_total(post_id, fields, output, page_id)
 
 @mcp.tool()
-def get_post_reactions_anger_total(post_id: str) -> dict[str, Any]:
+def get_post_reactions_anger_total(post_id: str, fields: list[str] | None = None, output: str = "raw",
+                                   page_id: str | None = None) -> dict[str, Any]:
     """Fetch number of 'Anger' reactions.
-    Input: post_id (str)
+    Input: post_id (str), fields (optional list of str), output (raw/compact/columnar), page_id (optional str)
     Output: dict with anger count
     """
-    return manager.get_post_reactions_anger_total(post_id)
+    return manager.get_post_reactions_anger_total(post_id, fields, output, page_id)
 
 @mcp.tool()
-def get_post_top_commenters(post_id: str) -> list[dict[str, Any]]:
+def get_post_top_commenters(post_id: str, output: str = "raw",
+                            page_id: str | None = None) -> list[dict[str, Any]] | dict[str, list[Any]]:
     """Get the top commenters on a post.
-    Input: post_id (str)
-    Output: list of user IDs with comment counts
+    Input: post_id (str), output (raw/columnar), page_id (optional str)
+    Output: list of user IDs with comment counts, or one array per field when columnar
     """
-    return manager.get_post_top_commenters(post_id)
+    return manager.get_post_top_commenters(post_id, output, page_id)
 
 @mcp.tool()
-def post_image_to_facebook(image_url: str, caption: str) -> dict[str, Any]:
+def post_image_to_facebook(image_url: str, caption: str, page_id: str | None = None) -> dict[str, Any]:
     """Post an image with a caption to the Facebook page.
-    Input: image_url (str), caption (str)
+    Input: image_url (str), caption (str), page_id (optional str)
+    Output: dict of post result
+    """
+    return manager.post_image_to_facebook(image_url, caption, page_id)
+
+@mcp.tool()
+def post_local_image_to_facebook(image_path: str, caption: str, page_id: str | None = None) -> dict[str, Any]:
+    """Upload an image from a local file and post it with a caption.
+    Input: image_path (str), caption (str), page_id (optional str)
     Output: dict of post result
     """
-    return manager.post_image_to_facebook(image_url, caption)
+    return manager.post_local_image_to_facebook(image_path, caption, page_id)
 
 @mcp.tool()
-def send_dm_to_user(user_id: str, message: str) -> dict[str, Any]:
+def post_multi_photo_to_facebook(image_paths: list[str], message: str, page_id: str | None = None) -> dict[str, Any]:
+    """Upload several local images and publish them together in one post.
+    Input: image_paths (list of str), message (str), page_id (optional str)
+    Output: dict of post result
+    """
+    return manager.post_multi_photo_to_facebook(image_paths, message, page_id)
+
+@mcp.tool()
+def post_video_to_facebook(video_path: str, description: str = "", title: str = "", page_id: str | None = None) -> dict[str, Any]:
+    """Upload a local video with a resumable upload session and publish it.
+    Input: video_path (str), description (str), title (str), page_id (optional str)
+    Output: dict of upload result
+    """
+    return manager.post_video_to_facebook(video_path, description, title, page_id)
+
+@mcp.tool()
+def send_dm_to_user(user_id: str, message: str, page_id: str | None = None) -> dict[str, Any]:
     """Send a direct message to a user.
-    Input: user_id (str), message (str)
+    Input: user_id (str), message (str), page_id (optional str)
     Output: dict of result from Messenger API
     """
-    return manager.send_dm_to_user(user_id, message)
+    return manager.send_dm_to_user(user_id, message, page_id)
 
 @mcp.tool()
-def update_post(post_id: str, new_message: str) -> dict[str, Any]:
+def update_post(post_id: str, new_message: str, page_id: str | None = None) -> dict[str, Any]:
     """Updates an existing post's message.
-    Input: post_id (str), new_message (str)
+    Input: post_id (str), new_message (str), page_id (optional str)
     Output: dict of update result
     """
-    return manager.update_post(post_id, new_message)
+    return manager.update_post(post_id, new_message, page_id)
 @mcp.tool()
-def schedule_post(message: str, publish_time: int) -> dict[str, Any]:
+def schedule_post(message: str, publish_time: int, page_id: str | None = None) -> dict[str, Any]:
     """Schedule a new post for future publishing.
-    Input: message (str), publish_time (Unix timestamp)
+    Input: message (str), publish_time (Unix timestamp), page_id (optional str)
     Output: dict with scheduled post info
     """
-    return manager.schedule_post(message, publish_time)
+    return manager.schedule_post(message, publish_time, page_id)
 
 @mcp.tool()
-def get_page_fan_count() -> int:
+def bulk_post_to_facebook(posts: list[dict[str, Any]], page_id: str | None = None) -> dict[str, Any]:
+    """Publish many posts at once in Graph-batched chunks.
+    Input: posts (list of dicts with message, optional image_url and optional key for retry deduplication), page_id (optional str)
+    Output: dict with succeeded/failed counts and a result per post
+    """
+    return manager.bulk_post_to_facebook(posts, page_id)
+
+@mcp.tool()
+def bulk_schedule_posts(posts: list[dict[str, Any]], page_id: str | None = None) -> dict[str, Any]:
+    """Schedule many posts at once in Graph-batched chunks.
+    Input: posts (list of dicts with message, publish_time (Unix timestamp), optional image_url and optional key), page_id (optional str)
+    Output: dict with succeeded/failed counts and a result per post
+    """
+    return manager.bulk_schedule_posts(posts, page_id)
+
+@mcp.tool()
+def get_page_fan_count(page_id: str | None = None) -> int:
     """Get the Page's total fan/like count.
-    Input: None
+    Input: page_id (optional str)
     Output: integer fan count
     """
-    return manager.get_page_fan_count()
+    return manager.get_page_fan_count(page_id)
 
 @mcp.tool()
-def get_post_share_count(post_id: str) -> int:
+def get_post_share_count(post_id: str, page_id: str | None = None) -> int:
     """Get the number of shares for a post.
-    Input: post_id (str)
+    Input: post_id (str), page_id (optional str)
     Output: integer share count
     """
-    return manager.get_post_share_count(post_id)
+    return manager.get_post_share_count(post_id, page_id)
 
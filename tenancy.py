@@ -0,0 +1,107 @@
+import json
+import threading
+from typing import Any
+from config import (APP_ID, APP_SECRET, PAGE_ACCESS_TOKEN, PAGE_ID, PAGE_ID_CONFIGURED, PAGE_RATE_BURST,
+                    PAGE_RATE_LIMIT, PAGES_FILE, PAGES_JSON, STATE_BACKEND, TOKEN_CACHE_FILE, USER_ACCESS_TOKEN)
+from backends import MEMORY_CACHE_SIZE, MemoryBackend, StateBackend, backend_from_url
+from bulk import BulkPublisher
+from facebook_api import FacebookAPI
+from ratelimit import RateLimiter, SharedRateLimiter
+from tokens import TokenManager
+
+
+class Tenant:
+    """A Facebook Page with its own API client, connection pool, rate-limit budget and state."""
+
+    def __init__(self, page: dict[str, Any], token_manager: TokenManager = None, state: StateBackend = None):
+        rate = float(page.get("rate_limit", PAGE_RATE_LIMIT))
+        burst = int(page.get("rate_burst", PAGE_RATE_BURST))
+        self.page_id = page["page_id"]
+        state = (state or MemoryBackend()).namespace(f"page:{self.page_id}")
+        # With a shared backend the page's budget is shared by every worker, not multiplied by them
+        rate_limiter = SharedRateLimiter(state, rate, burst) if state.shared else RateLimiter(rate, burst)
+        # In memory, each page gets its own bounded response cache, apart from state that must not be evicted
+        cache = state if state.shared else MemoryBackend(MEMORY_CACHE_SIZE)
+        self.api = FacebookAPI(self.page_id, page.get("access_token"), rate_limiter,
+                               token_manager=token_manager, state=state, cache=cache)
+        self.bulk = BulkPublisher(self.api)
+
+
+class TenantRegistry:
+    """Known pages keyed by page ID; clients are built on first use."""
+
+    def __init__(self, pages: list[dict[str, Any]], default_page_id: str = None, token_manager: TokenManager = None,
+                 state: StateBackend = None):
+        if not pages:
+            raise ValueError("At least one page must be configured")
+        if not token_manager and any(not page.get("access_token") for page in pages):
+            raise ValueError("Pages without an access_token need FACEBOOK_APP_ID, FACEBOOK_APP_SECRET and FACEBOOK_USER_TOKEN")
+        self.token_manager = token_manager
+        self.state = state or MemoryBackend()
+        self._pages = {page["page_id"]: page for page in pages}
+        # Optional human-friendly aliases, e.g. {"page_id": "123", "name": "brand-a"}
+        self._aliases = {page["name"]: page["page_id"] for page in pages if page.get("name")}
+        self.default_page_id = default_page_id or pages[0]["page_id"]
+        self._tenants: dict[str, Tenant] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "TenantRegistry":
+        """Load pages from FACEBOOK_PAGES / FACEBOOK_PAGES_FILE, falling back to the single configured page.
+
+        With a page list, FACEBOOK_PAGE_ID is only added (and made the default) when it is set explicitly;
+        otherwise the first listed page is the default.
+        """
+        pages = []
+        if PAGES_FILE:
+            with open(PAGES_FILE) as f:
+                pages = parse_pages(json.load(f))
+        elif PAGES_JSON:
+            pages = parse_pages(json.loads(PAGES_JSON))
+
+        use_page_id = PAGE_ID and PAGE_ACCESS_TOKEN and (PAGE_ID_CONFIGURED or not pages)
+        if use_page_id and all(page["page_id"] != PAGE_ID for page in pages):
+            pages.append({"page_id": PAGE_ID, "access_token": PAGE_ACCESS_TOKEN})
+
+        token_manager = None
+        if APP_ID and APP_SECRET and USER_ACCESS_TOKEN:
+            token_manager = TokenManager(APP_ID, APP_SECRET, USER_ACCESS_TOKEN, TOKEN_CACHE_FILE)
+            token_manager.start()
+        return cls(pages, PAGE_ID if use_page_id else None, token_manager,
+                   backend_from_url(STATE_BACKEND))
+
+    def page_ids(self) -> list[str]:
+        return list(self._pages)
+
+    def resolve(self, page: str = None) -> str:
+        page_id = self._aliases.get(page, page) if page else self.default_page_id
+        if page_id not in self._pages:
+            raise ValueError(f"Unknown page: {page}")
+        return page_id
+
+    def get(self, page: str = None) -> Tenant:
+        page_id = self.resolve(page)
+        tenant = self._tenants.get(page_id)
+        if tenant is None:
+            with self._lock:
+                tenant = self._tenants.get(page_id)
+                if tenant is None:
+                    tenant = self._tenants[page_id] = Tenant(self._pages[page_id], self.token_manager, self.state)
+        return tenant
+
+
+def parse_pages(raw: Any) -> list[dict[str, Any]]:
+    """Accept either {"page_id": "token", ...} or [{"page_id": ..., "access_token": ...}, ...].
+
+    access_token may be omitted when page tokens are managed by a TokenManager.
+    """
+    if isinstance(raw, dict) and "pages" in raw:
+        raw = raw["pages"]
+    if isinstance(raw, dict):
+        return [{"page_id": str(page_id), "access_token": token} for page_id, token in raw.items()]
+    pages = []
+    for page in raw:
+        if "page_id" not in page:
+            raise ValueError("Each page entry needs a page_id")
+        pages.append({**page, "page_id": str(page["page_id"])})
+    return pages
@@ -0,0 +1,140 @@
+import threading
+import time
+
+import pytest
+
+import admission
+from admission import ANALYTICS, CRITICAL, NORMAL, AdmissionController, Rejected
+
+
+def controller(**limits) -> AdmissionController:
+    settings = {"max_concurrent": 1, "max_queue": 4, "max_per_client": 4, "queue_timeout": 2.0, **limits}
+    return AdmissionController(**settings)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+def start_waiter(gate, priority, client, outcomes):
+    def run():
+        try:
+            gate.acquire(priority, client)
+            outcomes.append(client)
+        except Rejected as e:
+            outcomes.append(e.status)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_release_returns_the_slot():
+    gate = controller()
+    with gate.admit(NORMAL, "a"):
+        assert gate.stats() == {"running": 1, "queued": 0, "clients": 1}
+    assert gate.stats() == {"running": 0, "queued": 0, "clients": 0}
+
+
+def test_client_over_its_share_gets_429():
+    gate = controller(max_concurrent=4, max_per_client=2)
+    gate.acquire(NORMAL, "a")
+    gate.acquire(NORMAL, "a")
+    with pytest.raises(Rejected) as error:
+        gate.acquire(NORMAL, "a")
+    assert error.value.status == 429 and error.value.retry_after >= 1
+    gate.acquire(NORMAL, "b")
+
+
+def test_timed_out_waiter_leaves_the_queue():
+    gate = controller()
+    gate.acquire(NORMAL, "a")
+    with pytest.raises(Rejected) as error:
+        gate.acquire(NORMAL, "b", timeout=0.01)
+    assert error.value.status == 503
+    assert gate.stats() == {"running": 1, "queued": 0, "clients": 1}
+
+
+def test_expired_deadline_is_rejected_without_queueing():
+    gate = controller()
+    with pytest.raises(Rejected):
+        gate.acquire(NORMAL, "a", timeout=0)
+    assert gate.stats() == {"running": 0, "queued": 0, "clients": 0}
+
+
+def test_freed_slot_goes_to_the_highest_priority_waiter():
+    gate = controller()
+    gate.acquire(NORMAL, "holder")
+    outcomes = []
+    threads = [start_waiter(gate, ANALYTICS, "analytics", outcomes)]
+    wait_for(lambda: gate.stats()["queued"] == 1)
+    threads.append(start_waiter(gate, CRITICAL, "critical", outcomes))
+    wait_for(lambda: gate.stats()["queued"] == 2)
+    gate.release("holder")
+    wait_for(lambda: outcomes)
+    assert outcomes == ["critical"]
+    gate.release("critical")
+    for thread in threads:
+        thread.join(2)
+    assert outcomes == ["critical", "analytics"]
+    gate.release("analytics")
+    assert gate.stats() == {"running": 0, "queued": 0, "clients": 0}
+
+
+def test_full_queue_sheds_lower_priority_waiters():
+    gate = controller(max_queue=1)
+    gate.acquire(NORMAL, "holder")
+    outcomes = []
+    analytics = start_waiter(gate, ANALYTICS, "analytics", outcomes)
+    wait_for(lambda: gate.stats()["queued"] == 1)
+    critical = start_waiter(gate, CRITICAL, "critical", outcomes)
+    analytics.join(2)
+    assert outcomes == [503]
+    gate.release("holder")
+    critical.join(2)
+    assert outcomes == [503, "critical"]
+    gate.release("critical")
+    assert gate.stats() == {"running": 0, "queued": 0, "clients": 0}
+
+
+class InterruptedWaiter(admission.Waiter):
+    """Waiter whose wait is interrupted, optionally right after `before_raise` ran."""
+
+    before_raise = None
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.event.wait = self.interrupt
+
+    def interrupt(self, timeout=None):
+        if InterruptedWaiter.before_raise:
+            InterruptedWaiter.before_raise()
+        raise KeyboardInterrupt
+
+
+@pytest.fixture
+def interrupted(monkeypatch):
+    monkeypatch.setattr(admission, "Waiter", InterruptedWaiter)
+    yield InterruptedWaiter
+    InterruptedWaiter.before_raise = None
+
+
+def test_interrupted_waiter_leaves_the_queue(interrupted):
+    gate = controller()
+    gate.acquire(NORMAL, "holder")
+    with pytest.raises(KeyboardInterrupt):
+        gate.acquire(NORMAL, "b")
+    assert gate.stats() == {"running": 1, "queued": 0, "clients": 1}
+
+
+def test_slot_granted_to_an_interrupted_waiter_is_passed_on(interrupted):
+    gate = controller()
+    gate.acquire(NORMAL, "holder")
+    # The slot is handed over just before the wait is interrupted
+    interrupted.before_raise = lambda: gate.release("holder")
+    with pytest.raises(KeyboardInterrupt):
+        gate.acquire(NORMAL, "b")
+    assert gate.stats() == {"running": 0, "queued": 0, "clients": 0}
@@ -0,0 +1,149 @@
+import socketserver
+import threading
+import time
+
+import pytest
+
+from backends import MemoryBackend, NamespacedBackend, RedisBackend, SQLiteBackend, StateBackend
+from benchmarks.resp_server import RespServer
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryBackend()
+    elif request.param == "sqlite":
+        yield SQLiteBackend(str(tmp_path / "state.db"))
+    else:
+        server = RespServer().start()
+        yield RedisBackend(*server.server_address)
+        server.stop()
+
+
+def test_get_and_set(backend):
+    assert backend.get("missing") is None
+    backend.set("key", {"ids": [1, 2]})
+    assert backend.get("key") == {"ids": [1, 2]}
+    backend.set("key", "replaced")
+    assert backend.get("key") == "replaced"
+    backend.delete("key")
+    assert backend.get("key") is None
+
+
+def test_add_only_sets_missing_keys(backend):
+    assert backend.add("claim", "first")
+    assert not backend.add("claim", "second")
+    assert backend.get("claim") == "first"
+
+
+def test_incr_counts_from_amount(backend):
+    assert backend.incr("counter") == 1
+    assert backend.incr("counter", 5) == 6
+    assert backend.get("counter") == 6
+
+
+def test_ttl_expires_values(backend):
+    backend.set("value", 1, ttl=0.05)
+    backend.incr("counter", ttl=0.05)
+    assert backend.get("value") == 1
+    time.sleep(0.1)
+    assert backend.get("value") is None
+    assert backend.add("value", 2)
+    # An expired counter starts again from the amount
+    assert backend.incr("counter", ttl=0.05) == 1
+
+
+def test_incr_keeps_the_original_ttl(backend):
+    backend.incr("counter", ttl=0.1)
+    time.sleep(0.05)
+    backend.incr("counter", ttl=10)
+    time.sleep(0.1)
+    assert backend.get("counter") is None
+
+
+def test_namespaces_are_isolated(backend):
+    first, second = backend.namespace("page:1"), backend.namespace("page:2")
+    assert isinstance(first, NamespacedBackend)
+    first.set("key", "one")
+    assert second.get("key") is None
+    assert backend.get("page:1:key") == "one"
+
+
+def test_backends_must_implement_every_operation():
+    class Partial(StateBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        StateBackend()
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryBackend(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+class CountingServer(socketserver.ThreadingTCPServer):
+    """Reads one command per connection, answers it only if `reply` is set, then hangs up."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, reply: bool):
+        super().__init__(("127.0.0.1", 0), CountingHandler)
+        self.reply = reply
+        self.commands = []
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+
+class CountingHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        count = int(self.rfile.readline()[1:-2])
+        args = []
+        for _ in range(count):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        self.server.commands.append(args)
+        if self.server.reply:
+            self.wfile.write(b":1\r\n")
+
+
+@pytest.fixture
+def counting_server():
+    servers = []
+
+    def start(reply):
+        servers.append(CountingServer(reply))
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_redis_command_is_not_resent_after_the_connection_drops(counting_server):
+    server = counting_server(reply=False)
+    backend = RedisBackend(*server.server_address)
+    with pytest.raises(ConnectionError):
+        backend.incr("counter")
+    assert server.commands == [[b"INCRBY", b"counter", b"1"]]
+
+
+def test_redis_reconnects_when_an_idle_connection_was_closed(counting_server):
+    server = counting_server(reply=True)
+    backend = RedisBackend(*server.server_address)
+    assert backend.incr("counter") == 1
+    # Wait for the server's hang-up to reach the idle connection
+    deadline = time.monotonic() + 2
+    while not backend._stale(backend._local.conn[0]) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert backend.incr("counter") == 1
+    assert len(server.commands) == 2
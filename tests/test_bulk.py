@@ -0,0 +1,115 @@
+import http.client
+
+import pytest
+
+requests = pytest.importorskip("requests")
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ProtocolError
+
+from backends import MemoryBackend
+from bulk import BulkPublisher, not_sent
+from facebook_api import FacebookAPI
+
+POST = {"message": "Launch", "key": "launch"}
+
+
+def publisher(*outcomes):
+    """BulkPublisher whose batch calls return (or raise) the given outcomes in turn."""
+    api = FacebookAPI("1", "token")
+    calls = []
+
+    def batch(operations):
+        outcome = outcomes[min(len(calls), len(outcomes) - 1)]
+        calls.append(operations)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    api.batch = batch
+    return BulkPublisher(api), calls
+
+
+def refused():
+    return requests.exceptions.ConnectionError(
+        MaxRetryError(None, "/", NewConnectionError(None, "Connection refused")))
+
+
+def reset_after_send():
+    return requests.exceptions.ConnectionError(
+        ProtocolError("Connection aborted.", http.client.RemoteDisconnected("closed")))
+
+
+def test_published_key_is_deduplicated():
+    bulk, calls = publisher([{"code": 200, "body": '{"id": "p1"}'}])
+    assert bulk.publish([POST], scheduled=False)["succeeded"] == 1
+    result = bulk.publish([POST], scheduled=False)["results"][0]
+    assert result["deduplicated"] and result["data"] == {"id": "p1"}
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("outcome", [
+    [None],
+    requests.exceptions.ReadTimeout("read timed out"),
+    reset_after_send(),
+], ids=["null-response", "read-timeout", "reset-after-send"])
+def test_unknown_outcome_is_never_posted_again(outcome):
+    bulk, calls = publisher(outcome, [{"code": 200, "body": '{"id": "p1"}'}])
+    first = bulk.publish([POST], scheduled=False)["results"][0]
+    assert first["unknown"] and not first["success"]
+    second = bulk.publish([POST], scheduled=False)["results"][0]
+    assert second["unknown"] and second["deduplicated"]
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("error", [refused(), requests.exceptions.ConnectTimeout("connect timed out")],
+                         ids=["refused", "connect-timeout"])
+def test_failed_connect_can_be_retried(error):
+    bulk, calls = publisher(error, [{"code": 200, "body": '{"id": "p1"}'}])
+    first = bulk.publish([POST], scheduled=False)["results"][0]
+    assert not first["success"] and "unknown" not in first
+    assert bulk.publish([POST], scheduled=False)["succeeded"] == 1
+    assert len(calls) == 2
+
+
+def test_not_sent_only_for_connect_failures():
+    assert not_sent(refused())
+    assert not_sent(requests.exceptions.ConnectTimeout())
+    assert not not_sent(reset_after_send())
+    assert not not_sent(requests.exceptions.ReadTimeout())
+
+
+def test_graph_requests_have_a_timeout():
+    api = FacebookAPI("1", "token", timeout=7)
+    seen = {}
+
+    def request(method, url, **kwargs):
+        seen.update(kwargs)
+        raise requests.exceptions.ConnectTimeout()
+
+    api.session.request = request
+    with pytest.raises(requests.exceptions.ConnectTimeout):
+        api.post_message("hi")
+    assert seen["timeout"] == 7
+
+
+class FlakyBackend(MemoryBackend):
+    """Fails the first claim of `failing_key`, like a Redis timeout or a locked SQLite database."""
+
+    def __init__(self, failing_key):
+        super().__init__()
+        self.failing_key = failing_key
+
+    def add(self, key, value, ttl=None):
+        if self.failing_key and key.endswith(self.failing_key):
+            self.failing_key = None
+            raise OSError("backend unavailable")
+        return super().add(key, value, ttl)
+
+
+def test_claims_are_released_when_the_backend_fails_partway():
+    api = FacebookAPI("1", "token", state=FlakyBackend("second"))
+    api.batch = lambda operations: [{"code": 200, "body": '{"id": "p1"}'} for _ in operations]
+    bulk = BulkPublisher(api)
+    posts = [{"message": "a", "key": "first"}, {"message": "b", "key": "second"}]
+    with pytest.raises(OSError):
+        bulk.publish(posts, scheduled=False)
+    assert bulk.publish(posts, scheduled=False)["succeeded"] == 2
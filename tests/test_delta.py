@@ -0,0 +1,41 @@
+import time
+from datetime import datetime, timezone
+
+from delta import DeltaTracker
+
+
+def graph_time(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S%z")
+
+
+def test_first_poll_uses_graph_timestamps():
+    tracker = DeltaTracker()
+    old = {"id": "1", "created_time": graph_time(1000)}
+    assert tracker.changes("posts", [old], 2000)["data"] == []
+
+
+def test_item_created_within_the_cursor_second_is_returned():
+    tracker = DeltaTracker()
+    first = {"id": "1", "created_time": graph_time(time.time() - 60)}
+    cursor = tracker.changes("posts", [first], 0)["cursor"]
+    # Graph truncates to the second, so the new post looks older than the cursor
+    late = {"id": "2", "created_time": graph_time(int(cursor))}
+    result = tracker.changes("posts", [late, first], cursor)
+    assert [item["id"] for item in result["data"]] == ["2"]
+    # Once returned, it is not returned again
+    assert tracker.changes("posts", [late, first], result["cursor"])["data"] == []
+
+
+def test_item_dated_behind_by_facebook_clock_is_returned():
+    tracker = DeltaTracker()
+    cursor = tracker.changes("comments:1", [], 0)["cursor"]
+    skewed = {"id": "c1", "created_time": graph_time(cursor - 30)}
+    assert tracker.changes("comments:1", [skewed], cursor)["data"] == [skewed]
+
+
+def test_edit_is_returned():
+    tracker = DeltaTracker()
+    post = {"id": "1", "message": "a", "created_time": graph_time(1000)}
+    cursor = tracker.changes("posts", [post], 0)["cursor"]
+    edited = {**post, "message": "b"}
+    assert tracker.changes("posts", [edited], cursor)["data"] == [edited]
@@ -0,0 +1,52 @@
+import ast
+import json
+import os
+
+import pytest
+
+from benchmarks.startup import BUDGET_MS, ROOT, TARGETS, measure
+
+# Imported by the entry points themselves; without them there is nothing to time
+ENTRY_POINT_DEPENDENCIES = {"server": "mcp", "facebook_mcp_wrapper": "flask"}
+
+
+def load_manifest() -> list[dict]:
+    with open(os.path.join(ROOT, "tools_manifest.json")) as f:
+        return json.load(f)
+
+
+def server_tools() -> dict[str, list[str]]:
+    """Tool name -> parameter names of every @mcp.tool() function in server.py."""
+    with open(os.path.join(ROOT, "server.py")) as f:
+        tree = ast.parse(f.read())
+    return {
+        node.name: [arg.arg for arg in node.args.args]
+        for node in tree.body
+        if isinstance(node, ast.FunctionDef) and any(ast.unparse(d) == "mcp.tool()" for d in node.decorator_list)
+    }
+
+
+@pytest.mark.parametrize("target", TARGETS)
+def test_cold_start_within_budget(target):
+    pytest.importorskip(ENTRY_POINT_DEPENDENCIES[target])
+    result = measure(target, runs=3)
+    assert result["median_ms"] <= BUDGET_MS[target], f"{target} took {result['median_ms']:.1f}ms to import"
+    assert not result["loaded"], f"{target} imports {', '.join(result['loaded'])} at startup"
+
+
+def test_manifest_names_are_unique():
+    names = [tool["name"] for tool in load_manifest()]
+    assert len(names) == len(set(names))
+
+
+def test_manifest_matches_wrapper_dispatch():
+    pytest.importorskip("flask")
+    import facebook_mcp_wrapper
+    names = {tool["name"] for tool in load_manifest()}
+    assert names == set(facebook_mcp_wrapper.mcp_wrapper.tool_mapping)
+
+
+def test_manifest_matches_server_tools():
+    manifest = {tool["name"]: set(tool["parameters"]) for tool in load_manifest()}
+    tools = {name: set(params) for name, params in server_tools().items()}
+    assert manifest == tools
@@ -0,0 +1,41 @@
+import json
+import os
+import stat
+import threading
+
+import pytest
+
+pytest.importorskip("requests")
+
+from tokens import TokenManager
+
+
+def test_cache_is_written_privately_without_leftovers(tmp_path):
+    path = tmp_path / "tokens.json"
+    manager = TokenManager("app", "secret", "user-token", str(path))
+    manager._save()
+    assert json.loads(path.read_text())["user"]["token"] == "user-token"
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert os.listdir(tmp_path) == ["tokens.json"]
+
+
+def test_concurrent_saves_leave_a_complete_cache(tmp_path):
+    path = tmp_path / "tokens.json"
+    managers = [TokenManager("app", "secret", f"user-{i}", str(path)) for i in range(8)]
+    errors = []
+
+    def save(manager):
+        try:
+            for _ in range(20):
+                manager._save()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save, args=(manager,)) for manager in managers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert json.loads(path.read_text())["user"]["token"].startswith("user-")
+    assert os.listdir(tmp_path) == ["tokens.json"]
@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+from uploads import resolve_upload_path
+
+
+@pytest.fixture
+def root(tmp_path):
+    uploads = tmp_path / "uploads"
+    (uploads / "videos").mkdir(parents=True)
+    (tmp_path / "secret.txt").write_text("secret")
+    return str(uploads)
+
+
+def test_relative_paths_resolve_inside_the_root(root):
+    assert resolve_upload_path("videos/clip.mp4", root) == os.path.join(os.path.realpath(root), "videos", "clip.mp4")
+
+
+def test_absolute_path_inside_the_root_is_allowed(root):
+    path = os.path.join(root, "videos", "clip.mp4")
+    assert resolve_upload_path(path, root) == os.path.realpath(path)
+
+
+@pytest.mark.parametrize("path", ["../secret.txt", "videos/../../secret.txt", "/etc/passwd"])
+def test_paths_outside_the_root_are_refused(root, path):
+    with pytest.raises(PermissionError):
+        resolve_upload_path(path, root)
+
+
+def test_sibling_directory_with_the_same_prefix_is_refused(root):
+    os.mkdir(root + "-other")
+    with pytest.raises(PermissionError):
+        resolve_upload_path(root + "-other/clip.mp4", root)
+
+
+def test_symlink_out_of_the_root_is_refused(root):
+    os.symlink(os.path.join(os.path.dirname(root), "secret.txt"), os.path.join(root, "link.txt"))
+    with pytest.raises(PermissionError):
+        resolve_upload_path("link.txt", root)
+
+
+def test_uploads_are_disabled_without_a_root():
+    with pytest.raises(PermissionError):
+        resolve_upload_path("clip.mp4", None)
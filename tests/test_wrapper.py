@@ -0,0 +1,66 @@
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("requests")
+
+import facebook_mcp_wrapper
+from manager import Manager
+from tenancy import TenantRegistry
+
+
+@pytest.fixture
+def client(monkeypatch):
+    registry = TenantRegistry([{"page_id": "1", "access_token": "token"}])
+    api = registry.get("1").api
+    api.calls = []
+
+    def get_posts(changed_since=None, fields=None):
+        api.calls.append(changed_since)
+        return {"data": [{"id": "1_2", "message": "Launch"}]}
+
+    api.get_posts = get_posts
+    monkeypatch.setattr(facebook_mcp_wrapper.mcp_wrapper, "manager", Manager(registry))
+    client = facebook_mcp_wrapper.app.test_client()
+    client.api = api
+    return client
+
+
+def call(client, tool, **arguments):
+    return client.post(f"/tools/{tool}", json={"arguments": arguments})
+
+
+def test_tool_call_succeeds(client):
+    response = call(client, "get_page_posts", output="compact")
+    assert response.status_code == 200
+    assert response.get_json()["data"]["data"] == [{"id": "1_2", "message": "Launch"}]
+
+
+def test_unknown_tool_is_404(client):
+    response = call(client, "no_such_tool")
+    assert response.status_code == 404
+    assert response.get_json()["error"] == "Unknown tool: no_such_tool"
+
+
+def test_unknown_output_mode_is_400(client):
+    response = call(client, "get_page_posts", output="bogus")
+    assert response.status_code == 400
+    assert "Unknown output mode" in response.get_json()["error"]
+
+
+def test_unknown_page_is_400(client):
+    response = call(client, "get_page_posts", page_id="999")
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Unknown page: 999"
+
+
+@pytest.mark.parametrize("changed_since", ["yesterday", "1700000000", True, [1], {"t": 1}])
+def test_non_numeric_changed_since_is_400(client, changed_since):
+    response = call(client, "get_page_posts", changed_since=changed_since)
+    assert response.status_code == 400
+    assert "changed_since" in response.get_json()["error"]
+    assert client.api.calls == []
+
+
+def test_numeric_changed_since_is_passed_on(client):
+    assert call(client, "get_page_posts", changed_since=1700000000).status_code == 200
+    assert client.api.calls == [1700000000.0]
@@ -0,0 +1,200 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any
+import requests
+from config import GRAPH_API_BASE_URL, REQUEST_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# Refresh tokens this long before they expire
+REFRESH_MARGIN = 7 * 24 * 60 * 60
+# How often the background thread looks for tokens that are due
+CHECK_INTERVAL = 60 * 60
+# Wait before retrying after a failed refresh
+RETRY_INTERVAL = 5 * 60
+# Minimum time between refreshes, so a token that cannot be extended is not refreshed on every read
+MIN_REFRESH_INTERVAL = 15 * 60
+
+
+class TokenManager:
+    """Keeps page access tokens fresh without blocking callers.
+
+    A user token is exchanged for a long-lived one, page tokens are resolved from it with
+    /me/accounts, and expiry times come from /debug_token. Tokens are cached in memory and
+    on disk; a background thread refreshes them before they expire.
+    """
+
+    def __init__(self, app_id: str, app_secret: str, user_token: str, cache_path: str = None,
+                 refresh_margin: int = REFRESH_MARGIN):
+        self.app_id = app_id
+        self.app_secret = app_secret
+        self.cache_path = cache_path
+        self.refresh_margin = refresh_margin
+        self.session = requests.Session()
+        self._cache: dict[str, Any] = {"seed": user_token, "user": {"token": user_token, "expires_at": None}, "pages": {}}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._requested = False
+        self._retry_at = 0.0
+        self._thread = None
+        self._load()
+
+    def get_page_token(self, page_id: str, fallback: str = None) -> str:
+        """Return the cached token for a page, scheduling a background refresh when it is due.
+
+        Only blocks when no token for the page is known at all, neither cached nor as a fallback.
+        """
+        with self._lock:
+            entry = self._cache["pages"].get(page_id)
+        if entry and not self._due(entry):
+            return entry["token"]
+        if entry or fallback:
+            if time.time() >= self._retry_at:
+                self._schedule_refresh()
+            return entry["token"] if entry else fallback
+
+        self.refresh()
+        with self._lock:
+            entry = self._cache["pages"].get(page_id)
+        if not entry:
+            raise ValueError(f"No access token available for page {page_id}")
+        return entry["token"]
+
+    def start(self) -> None:
+        """Start the background refresh thread."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="token-refresh", daemon=True)
+                self._thread.start()
+
+    def refresh(self) -> None:
+        """Exchange the user token if needed and re-resolve all page tokens."""
+        if not self._refresh_lock.acquire(blocking=False):
+            # Another thread is refreshing; wait for it rather than refreshing twice
+            with self._refresh_lock:
+                return
+        try:
+            if time.time() < self._retry_at:
+                return
+            user = self._refresh_user_token()
+            pages = self._fetch_page_tokens(user["token"])
+            with self._lock:
+                self._cache["user"] = user
+                self._cache["pages"].update(pages)
+            self._save()
+            self._retry_at = time.time() + MIN_REFRESH_INTERVAL
+        except Exception as e:
+            logger.warning(f"Token refresh failed: {str(e)}")
+            self._retry_at = time.time() + RETRY_INTERVAL
+        finally:
+            self._refresh_lock.release()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                entries = [self._cache["user"], *self._cache["pages"].values()]
+            self._warn_data_access(entries)
+            if self._requested or any(self._due(entry) for entry in entries):
+                self._requested = False
+                self.refresh()
+            self._wakeup.wait(CHECK_INTERVAL)
+            self._wakeup.clear()
+
+    def _schedule_refresh(self) -> None:
+        self._requested = True
+        self.start()
+        self._wakeup.set()
+
+    def _due(self, entry: dict[str, Any]) -> bool:
+        # expires_at of None means unknown, 0 means the token never expires
+        expires_at = entry.get("expires_at")
+        return expires_at is None or (expires_at != 0 and expires_at - self.refresh_margin <= time.time())
+
+    # Data access can only be renewed by the user logging in again, so it is reported, not refreshed
+    def _warn_data_access(self, entries: list[dict[str, Any]]) -> None:
+        deadlines = [e["data_access_expires_at"] for e in entries if e.get("data_access_expires_at")]
+        if deadlines and min(deadlines) - self.refresh_margin <= time.time():
+            logger.warning(f"Data access for the configured user token ends at {time.ctime(min(deadlines))}; "
+                           "the user must re-authorize the app to renew it")
+
+    def _graph(self, endpoint: str, params: dict[str, Any]) -> dict[str, Any]:
+        data = self.session.get(f"{GRAPH_API_BASE_URL}/{endpoint}", params=params, timeout=REQUEST_TIMEOUT).json()
+        if "error" in data:
+            raise RuntimeError(data["error"].get("message", "Graph API error"))
+        return data
+
+    def _expiry(self, token: str) -> dict[str, int]:
+        """expires_at (0 if the token never expires) and data_access_expires_at of a token."""
+        data = self._graph("debug_token", {
+            "input_token": token,
+            "access_token": f"{self.app_id}|{self.app_secret}",
+        }).get("data", {})
+        if not data.get("is_valid", False):
+            raise RuntimeError(data.get("error", {}).get("message", "Token is no longer valid"))
+        # Page tokens never expire but lose data access, which no token exchange can extend
+        return {"expires_at": data.get("expires_at", 0), "data_access_expires_at": data.get("data_access_expires_at", 0)}
+
+    def _refresh_user_token(self) -> dict[str, Any]:
+        with self._lock:
+            user = dict(self._cache["user"])
+        if not self._due(user):
+            return user
+        exchanged = self._graph("oauth/access_token", {
+            "grant_type": "fb_exchange_token",
+            "client_id": self.app_id,
+            "client_secret": self.app_secret,
+            "fb_exchange_token": user["token"],
+        })
+        token = exchanged["access_token"]
+        return {"token": token, **self._expiry(token)}
+
+    def _fetch_page_tokens(self, user_token: str) -> dict[str, dict[str, Any]]:
+        pages = {}
+        params = {"fields": "id,access_token", "limit": 100, "access_token": user_token}
+        while True:
+            data = self._graph("me/accounts", params)
+            for page in data.get("data", []):
+                pages[page["id"]] = {"token": page["access_token"], **self._expiry(page["access_token"])}
+            after = data.get("paging", {}).get("cursors", {}).get("after")
+            if not after or not data.get("paging", {}).get("next"):
+                break
+            params = {**params, "after": after}
+        return pages
+
+    def _load(self) -> None:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path) as f:
+                cached = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable token cache {self.cache_path}: {str(e)}")
+            return
+        # A different configured user token means the cached one was replaced on purpose
+        if cached.get("seed") != self._cache["seed"]:
+            return
+        self._cache["pages"].update(cached.get("pages", {}))
+        if cached.get("user", {}).get("token"):
+            self._cache["user"] = cached["user"]
+
+    def _save(self) -> None:
+        if not self.cache_path:
+            return
+        with self._lock:
+            snapshot = json.dumps(self._cache)
+        # Write atomically and readable only by the owner (mkstemp uses mode 0600), since the file holds
+        # credentials. The temporary name is unique, so concurrent writers never share a half-written file
+        directory = os.path.dirname(os.path.abspath(self.cache_path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(self.cache_path)}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(snapshot)
+            os.replace(tmp_path, self.cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
@@ -0,0 +1,104 @@
+import io
+import mimetypes
+import os
+import uuid
+from typing import Any, BinaryIO
+
+# Size of the read buffer used while streaming file contents
+READ_SIZE = 64 * 1024
+
+
+def open_source(source: Any) -> tuple[BinaryIO, int, bool]:
+    """Open a path, bytes or binary stream. Returns (stream, size, should_close)."""
+    if isinstance(source, (str, os.PathLike)):
+        stream = open(source, "rb")
+        return stream, os.fstat(stream.fileno()).st_size, True
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source), len(source), True
+    # Any seekable binary stream; the remaining bytes from its current position are uploaded
+    position = source.tell()
+    size = source.seek(0, io.SEEK_END) - position
+    source.seek(position)
+    return source, size, False
+
+
+def resolve_upload_path(path: str, root: str | None) -> str:
+    """Real path of `path` inside the upload directory `root`; relative paths are taken from root.
+
+    Raises PermissionError when no upload directory is configured, or when the path leaves it
+    (after resolving symlinks and "..").
+    """
+    if not root:
+        raise PermissionError("Uploads from local paths are disabled; set FACEBOOK_UPLOAD_DIR to enable them")
+    root = os.path.realpath(root)
+    resolved = os.path.realpath(os.path.join(root, os.fspath(path)))
+    if os.path.commonpath([root, resolved]) != root:
+        raise PermissionError(f"{path} is outside the upload directory")
+    return resolved
+
+
+def source_name(source: Any, default: str = "upload") -> str:
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.basename(os.fspath(source))
+    return os.path.basename(getattr(source, "name", "") or default)
+
+
+class FileWindow:
+    """Read-only view of `length` bytes of a stream starting at `offset`."""
+
+    def __init__(self, stream: BinaryIO, offset: int, length: int):
+        self._stream = stream
+        self._offset = offset
+        self._remaining = length
+        self._length = length
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        if self._remaining <= 0:
+            return b""
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        self._stream.seek(self._offset)
+        data = self._stream.read(size)
+        self._offset += len(data)
+        self._remaining -= len(data)
+        return data
+
+
+class MultipartStream:
+    """multipart/form-data body that streams its file part instead of loading it into memory.
+
+    requests sends any object with `read` and `len` as a streamed body with a Content-Length.
+    """
+
+    def __init__(self, fields: dict[str, Any], file_field: str, content: FileWindow, filename: str):
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        file_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+        head = io.BytesIO()
+        for name, value in fields.items():
+            head.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+        head.write(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+            f"Content-Type: {file_type}\r\n\r\n".encode()
+        )
+        tail = f"\r\n--{boundary}--\r\n".encode()
+
+        self.len = len(head.getvalue()) + len(content) + len(tail)
+        self._parts = [io.BytesIO(head.getvalue()), content, io.BytesIO(tail)]
+
+    def __len__(self) -> int:
+        return self.len
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            return b"".join(iter(lambda: self.read(READ_SIZE), b""))
+        while self._parts:
+            data = self._parts[0].read(size)
+            if data:
+                return data
+            self._parts.pop(0)
+        return b""